@@ -0,0 +1,75 @@
+-- =====================================================
+-- TeeMail Demo Performance Index Migration
+-- Date: 2026-08-30
+-- =====================================================
+
+-- IMPORTANT: Back up your database before running this migration!
+-- These indexes speed up the email automation listing queries.
+
+BEGIN;
+
+-- =====================================================
+-- 1. EMAIL-DUE BOOKINGS INDEX
+-- =====================================================
+-- Partial index matching the pre-arrival email candidate query:
+-- active statuses with no pre-arrival email sent yet, ordered by
+-- date and tee time. Lets the planner use an index scan instead of
+-- a full table scan.
+
+CREATE INDEX IF NOT EXISTS bookings_email_due_idx
+    ON bookings (date, tee_time)
+    WHERE status IN ('Confirmed', 'Booked', 'Requested', 'Inquiry')
+      AND pre_arrival_email_sent_at IS NULL;
+
+-- =====================================================
+-- 2. DASHBOARD LOAD INDEX
+-- =====================================================
+-- load_bookings_from_db filters by club and orders by timestamp DESC
+-- on every cache miss; this composite index satisfies both without a
+-- sort, with the hottest columns included for index-only scans.
+
+CREATE INDEX IF NOT EXISTS idx_bookings_club_ts
+    ON bookings (club, timestamp DESC)
+    INCLUDE (booking_id, guest_email, status);
+
+-- =====================================================
+-- 3. INBOUND EMAILS INDEX
+-- =====================================================
+-- load_emails_for_bookings filters by booking_id and orders by
+-- received_at DESC for the page's booking cards.
+
+CREATE INDEX IF NOT EXISTS idx_inbound_booking
+    ON inbound_emails (booking_id, received_at DESC);
+
+-- Functional indexes for the normalized email-equality fallback used
+-- when an inbound email is not yet linked to a booking.
+
+CREATE INDEX IF NOT EXISTS idx_inbound_from_lower
+    ON inbound_emails (lower(from_email));
+
+CREATE INDEX IF NOT EXISTS idx_inbound_to_lower
+    ON inbound_emails (lower(to_email));
+
+-- =====================================================
+-- 4. PAYMENT HISTORY INDEX
+-- =====================================================
+-- The payment-history panel fetches payments by booking_id ordered by
+-- created_at DESC (per booking and batched per page); this composite
+-- index turns the heap scan + sort into an index range scan.
+
+CREATE INDEX IF NOT EXISTS idx_payments_booking_created
+    ON payments (booking_id, created_at DESC);
+
+-- =====================================================
+-- 5. STATUS FILTER INDEX
+-- =====================================================
+-- Status-filtered list queries scope by club first; pairs with
+-- idx_bookings_club_ts for the unfiltered ordering case.
+
+CREATE INDEX IF NOT EXISTS idx_bookings_club_status
+    ON bookings (club, status);
+
+COMMIT;
+
+-- Verify the index exists:
+-- SELECT indexname FROM pg_indexes WHERE tablename = 'bookings';
@@ -1,18 +1,27 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
-import bcrypt
+import logging
 import psycopg
 from psycopg.rows import dict_row
 from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+import gzip
+import hashlib
 import html
 import re
 import json
 import requests
 import stripe
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+
+logger = logging.getLogger(__name__)
+
+# bcrypt and sendgrid are deliberately imported inside the functions that
+# use them (auth and email sending) to keep dashboard cold-start fast;
+# pandas stays top-level because the page body uses it at import time
 
 # ========================================
 # DATABASE CONNECTION
@@ -23,6 +32,17 @@ def get_db_connection():
     """Get database connection"""
     return psycopg.connect(DATABASE_URL)
 
+
+@st.cache_resource
+def get_pool():
+    """Shared Postgres connection pool (global across sessions).
+
+    Pooling amortizes the TCP/TLS/auth handshake that otherwise dominates
+    single-row UPDATEs on the hot dashboard paths.
+    """
+    from psycopg_pool import ConnectionPool
+    return ConnectionPool(DATABASE_URL, min_size=1, max_size=10)
+
 # ========================================
 # STRIPE CONFIGURATION
 # ========================================
@@ -31,9 +51,17 @@ STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
 DEFAULT_DEPOSIT_PERCENTAGE = int(os.getenv("DEFAULT_DEPOSIT_PERCENTAGE", "20"))
 TOUR_OPERATOR_DEPOSIT_PERCENTAGE = 50
 
-if STRIPE_SECRET_KEY:
+@st.cache_resource(show_spinner=False)
+def _stripe_client():
+    """Stripe SDK configured once per process instead of per script run."""
     stripe.api_key = STRIPE_SECRET_KEY
+    return stripe
+
 
+# Memoized so double-clicks and reruns within the TTL reuse the link
+# instead of re-hitting the Stripe API; the idempotency key below makes
+# retries free on Stripe's side as well
+@st.cache_data(ttl=300, show_spinner=False)
 def create_stripe_payment_link(booking_id: str, amount: float, payment_type: str, deposit_percentage: int, guest_email: str, guest_name: str = None):
     """
     Create a Stripe payment link for a booking
@@ -47,7 +75,9 @@ def create_stripe_payment_link(booking_id: str, amount: float, payment_type: str
         guest_name: Customer name (optional)
 
     Returns:
-        dict with payment_link_url, payment_id, and stripe_payment_link_id
+        dict with payment_link_url and stripe_payment_link_id
+        (the payments-table payment_id is minted at the call site so a
+        memoized link never replays a unique id into an INSERT)
     """
     if not STRIPE_SECRET_KEY:
         raise ValueError("STRIPE_SECRET_KEY is not set. Please configure Stripe API key in environment variables.")
@@ -60,7 +90,7 @@ def create_stripe_payment_link(booking_id: str, amount: float, payment_type: str
         product_name += f" - {booking_id}"
 
         # Create Stripe payment link
-        payment_link = stripe.PaymentLink.create(
+        payment_link = _stripe_client().PaymentLink.create(
             line_items=[{
                 'price_data': {
                     'currency': 'eur',
@@ -85,15 +115,12 @@ def create_stripe_payment_link(booking_id: str, amount: float, payment_type: str
             },
             customer_creation='always',
             billing_address_collection='auto',
-            phone_number_collection={'enabled': True}
+            phone_number_collection={'enabled': True},
+            idempotency_key=f"{booking_id}:{payment_type}:{int(amount * 100)}"
         )
 
-        # Generate unique payment ID
-        payment_id = f"PAY-{datetime.now().strftime('%Y%m%d%H%M%S')}-{booking_id}"
-
         return {
             'payment_link_url': payment_link.url,
-            'payment_id': payment_id,
             'stripe_payment_link_id': payment_link.id
         }
     except Exception as e:
@@ -121,7 +148,7 @@ def save_payment_record(booking_id: str, payment_id: str, amount: float, payment
         # Update booking payment status
         cursor.execute("""
             UPDATE bookings
-            SET payment_status = %s
+            SET payment_status = %s, updated_at = NOW()
             WHERE booking_id = %s
         """, ('pending', booking_id))
 
@@ -133,25 +160,64 @@ def save_payment_record(booking_id: str, payment_id: str, amount: float, payment
         print(f"Error saving payment record: {e}")
         return False
 
-def get_booking_payments(booking_id: str):
-    """Get all payment records for a booking"""
+@st.cache_data(ttl=60, show_spinner=False)
+def get_payments_by_booking_ids(booking_ids):
+    """Get payment records for many bookings in one query.
+
+    Returns {booking_id: [payment dicts]} sorted newest-first so each
+    card does an O(1) lookup instead of its own round trip.
+    """
+    if not booking_ids:
+        return {}
     try:
         conn = get_db_connection()
         cursor = conn.cursor(row_factory=dict_row)
 
+        # Only the columns the history panel renders, not SELECT *
         cursor.execute("""
-            SELECT * FROM payments
-            WHERE booking_id = %s
+            SELECT booking_id, payment_type, amount, payment_status, created_at
+            FROM payments
+            WHERE booking_id = ANY(%s)
             ORDER BY created_at DESC
-        """, (booking_id,))
-
-        payments = cursor.fetchall()
+        """, (list(booking_ids),))
+
+        payments_map = {}
+        for payment in cursor.fetchall():
+            # Pre-format the date while grouping so the cached rows carry
+            # the display string and the render path does no per-row
+            # strftime/pd.isna dispatch
+            created_at = payment['created_at']
+            payment['date_str'] = created_at.strftime('%b %d, %Y') if created_at else 'N/A'
+            payments_map.setdefault(payment['booking_id'], []).append(payment)
         cursor.close()
         conn.close()
-        return payments
+        return payments_map
     except Exception as e:
         print(f"Error fetching payments: {e}")
-        return []
+        return {}
+
+def build_payment_history_html(payments):
+    """Build the payment-history card as one HTML blob.
+
+    A single st.markdown call per booking replaces the wrapper, one call
+    per payment row, and the closing tag.
+    """
+    rows = []
+    for payment in payments[:3]:  # Show last 3 payments
+        # date_str is pre-formatted by the fetch helpers
+        rows.append(
+            "<div style='background: #2d3e50; padding: 0.5rem; border-radius: 4px; margin-bottom: 0.5rem;'>"
+            f"<div style='color: #ffffff; font-size: 0.75rem;'>{payment['payment_type'].capitalize()}: €{payment['amount']:.2f}</div>"
+            f"<div style='color: #94a3b8; font-size: 0.65rem;'>{payment['date_str']} • {payment['payment_status']}</div>"
+            "</div>"
+        )
+
+    return (
+        "<div style='margin-top: 1rem; padding: 0.75rem; background: #1e3a8a; border-radius: 8px; border: 2px solid #3b82f6;'>"
+        "<div style='color: #3b82f6; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Payment History</div>"
+        + "".join(rows) + "</div>"
+    )
+
 
 def update_tour_operator_status(booking_id: str, is_tour_operator: bool):
     """Update tour operator status for a booking"""
@@ -164,7 +230,7 @@ def update_tour_operator_status(booking_id: str, is_tour_operator: bool):
 
         cursor.execute("""
             UPDATE bookings
-            SET is_tour_operator = %s, deposit_percentage = %s
+            SET is_tour_operator = %s, deposit_percentage = %s, updated_at = NOW()
             WHERE booking_id = %s
         """, (is_tour_operator, deposit_percentage, booking_id))
 
@@ -289,6 +355,11 @@ def get_club_info(club_id: str) -> dict:
         'website': 'N/A'
     })
 
+# Compiled once at import; matches "Time: 12:20 PM" and "Tee Time: 3:45 PM"
+# in any casing, covering all three of the old per-call patterns
+_TEE_TIME_RE = re.compile(r'(?:Tee\s+)?Time:\s*(\d{1,2}:\d{2}\s*[AaPp][Mm])', re.IGNORECASE)
+
+
 def extract_tee_time_from_note(note_content):
     """
     Extract tee time from email content.
@@ -300,19 +371,10 @@ def extract_tee_time_from_note(note_content):
     if not note_content or pd.isna(note_content):
         return None
 
-    # Pattern to match "Time: HH:MM AM/PM"
-    patterns = [
-        r'Time:\s*(\d{1,2}:\d{2}\s*[AaPp][Mm])',  # Time: 12:20 PM
-        r'time:\s*(\d{1,2}:\d{2}\s*[AaPp][Mm])',  # time: 12:20 pm (case insensitive)
-        r'Tee\s+Time:\s*(\d{1,2}:\d{2}\s*[AaPp][Mm])',  # Tee Time: 12:20 PM
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, str(note_content), re.IGNORECASE)
-        if match:
-            tee_time = match.group(1).strip()
-            # Normalize to uppercase (12:20 PM)
-            return tee_time.upper()
+    match = _TEE_TIME_RE.search(str(note_content))
+    if match:
+        # Normalize to uppercase (12:20 PM)
+        return match.group(1).strip().upper()
 
     return None
 
@@ -343,6 +405,40 @@ class EmailConfig:
     POST_PLAY_DAYS = 2
 
 
+@st.cache_resource(show_spinner=False)
+def _email_dispatcher():
+    """Background worker pool for email delivery plus its outcome tally.
+
+    Held in cache_resource like get_pool(): the main script re-executes
+    in a fresh namespace on every rerun, so module-level state would
+    leak a new thread pool per rerun and zero the tally the callbacks
+    write into. The lock keeps increments atomic across workers.
+    """
+    return {
+        'executor': ThreadPoolExecutor(max_workers=8, thread_name_prefix='email'),
+        'lock': threading.Lock(),
+        'stats': {'sent': 0, 'failed': 0},
+    }
+
+
+def _record_email_result(booking_id):
+    """Done-callback factory for queued sends: the send_* helpers report
+    failure as a (False, message) return rather than raising, so a
+    dropped future would swallow SendGrid errors silently."""
+    dispatcher = _email_dispatcher()
+
+    def _done(future):
+        try:
+            success, message = future.result()
+        except Exception as e:
+            success, message = False, str(e)
+        with dispatcher['lock']:
+            dispatcher['stats']['sent' if success else 'failed'] += 1
+        if not success:
+            logger.warning("Background email for %s failed: %s", booking_id, message)
+    return _done
+
+
 def extract_tee_time_from_selected_tee_times(selected_tee_times):
     """Extract tee time from selected_tee_times field"""
     if not selected_tee_times:
@@ -352,16 +448,23 @@ def extract_tee_time_from_selected_tee_times(selected_tee_times):
         return selected_tee_times.get('time')
 
     if isinstance(selected_tee_times, str):
-        try:
-            data = json.loads(selected_tee_times)
-            if isinstance(data, dict) and 'time' in data:
-                return data['time']
-        except (json.JSONDecodeError, ValueError):
-            pass
-
-        map_time_match = re.search(r'time:(\d{1,2}:\d{2}\s*[AaPp][Mm])', selected_tee_times)
-        if map_time_match:
-            return map_time_match.group(1).strip()
+        # Cheap guards first: substring/prefix checks are much faster
+        # than firing up json.loads or the regex engine on every row
+        if len(selected_tee_times) < 4:
+            return None
+
+        if selected_tee_times.startswith('{') or selected_tee_times.startswith('['):
+            try:
+                data = json.loads(selected_tee_times)
+                if isinstance(data, dict) and 'time' in data:
+                    return data['time']
+            except (json.JSONDecodeError, ValueError):
+                pass
+
+        if 'time:' in selected_tee_times:
+            map_time_match = re.search(r'time:(\d{1,2}:\d{2}\s*[AaPp][Mm])', selected_tee_times)
+            if map_time_match:
+                return map_time_match.group(1).strip()
 
         if re.match(r'\d{1,2}:\d{2}\s*[AaPp][Mm]', selected_tee_times):
             return selected_tee_times
@@ -401,8 +504,6 @@ def get_upcoming_bookings_for_email(days_ahead=None, club_filter=None):
         where_conditions.append("(club = %s OR club IS NULL OR club = '')")
         params.append(club_filter)
 
-    where_clause = " AND ".join(where_conditions)
-
     cursor.execute("""
         SELECT column_name
         FROM information_schema.columns
@@ -411,9 +512,15 @@ def get_upcoming_bookings_for_email(days_ahead=None, club_filter=None):
     """)
     has_tracking = cursor.fetchone() is not None
 
+    # Filter already-sent bookings in SQL so the query matches the
+    # bookings_email_due_idx partial index predicate
+    if has_tracking:
+        where_conditions.append("pre_arrival_email_sent_at IS NULL")
+
+    where_clause = " AND ".join(where_conditions)
+
     query = f"""
         SELECT
-            id,
             booking_id,
             guest_email,
             guest_name,
@@ -424,9 +531,6 @@ def get_upcoming_bookings_for_email(days_ahead=None, club_filter=None):
             players,
             total,
             golf_courses,
-            hotel_required,
-            hotel_checkin,
-            hotel_checkout,
             {('pre_arrival_email_sent_at' if has_tracking else 'NULL as pre_arrival_email_sent_at')}
         FROM bookings
         WHERE {where_clause}
@@ -435,12 +539,10 @@ def get_upcoming_bookings_for_email(days_ahead=None, club_filter=None):
 
     cursor.execute(query, params)
     bookings = cursor.fetchall()
+
     cursor.close()
     conn.close()
 
-    if has_tracking:
-        bookings = [b for b in bookings if not b.get('pre_arrival_email_sent_at')]
-
     return bookings
 
 
@@ -458,8 +560,6 @@ def get_recent_bookings_for_email(days_ago=None, club_filter=None):
         where_conditions.append("(club = %s OR club IS NULL OR club = '')")
         params.append(club_filter)
 
-    where_clause = " AND ".join(where_conditions)
-
     cursor.execute("""
         SELECT column_name
         FROM information_schema.columns
@@ -468,9 +568,14 @@ def get_recent_bookings_for_email(days_ago=None, club_filter=None):
     """)
     has_tracking = cursor.fetchone() is not None
 
+    # Filter already-sent bookings in SQL, same as the pre-arrival query
+    if has_tracking:
+        where_conditions.append("post_play_email_sent_at IS NULL")
+
+    where_clause = " AND ".join(where_conditions)
+
     query = f"""
         SELECT
-            id,
             booking_id,
             guest_email,
             guest_name,
@@ -489,20 +594,15 @@ def get_recent_bookings_for_email(days_ago=None, club_filter=None):
 
     cursor.execute(query, params)
     bookings = cursor.fetchall()
+
     cursor.close()
     conn.close()
 
-    if has_tracking:
-        bookings = [b for b in bookings if not b.get('post_play_email_sent_at')]
-
     return bookings
 
 
 def mark_email_sent(booking_id, email_type):
     """Mark email as sent in database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     column_map = {
         'pre_arrival': 'pre_arrival_email_sent_at',
         'post_play': 'post_play_email_sent_at'
@@ -512,29 +612,32 @@ def mark_email_sent(booking_id, email_type):
     if not column:
         return
 
-    cursor.execute(f"""
-        SELECT column_name
-        FROM information_schema.columns
-        WHERE table_name = 'bookings'
-        AND column_name = %s
-    """, (column,))
-
-    if cursor.fetchone():
-        cursor.execute(f"""
-            UPDATE bookings
-            SET {column} = CURRENT_TIMESTAMP
-            WHERE booking_id = %s
-        """, (booking_id,))
-        conn.commit()
-
-    cursor.close()
-    conn.close()
+    # Pooled connection so the prepared plans survive across repeated
+    # marks (and the pool is safe to use from the background senders)
+    with get_pool().connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = 'bookings'
+                AND column_name = %s
+            """, (column,), prepare=True)
+
+            if cursor.fetchone():
+                cursor.execute(f"""
+                    UPDATE bookings
+                    SET {column} = CURRENT_TIMESTAMP
+                    WHERE booking_id = %s
+                """, (booking_id,), prepare=True)
 
 
-def send_pre_arrival_email(booking):
-    """Send pre-arrival welcome email"""
+def _send_templated_email(booking, template_id, email_type, success_prefix):
+    """Send a SendGrid dynamic-template email and mark it as sent"""
     try:
-        if not EmailConfig.SENDGRID_API_KEY or not EmailConfig.FROM_EMAIL or not EmailConfig.TEMPLATE_PRE_ARRIVAL:
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+
+        if not EmailConfig.SENDGRID_API_KEY or not EmailConfig.FROM_EMAIL or not template_id:
             return False, "SendGrid not configured"
 
         if not booking.get('booking_id') or not booking.get('guest_email') or not booking.get('play_date'):
@@ -570,15 +673,15 @@ def send_pre_arrival_email(booking):
             from_email=(EmailConfig.FROM_EMAIL, EmailConfig.FROM_NAME),
             to_emails=guest_email
         )
-        message.template_id = EmailConfig.TEMPLATE_PRE_ARRIVAL
+        message.template_id = template_id
         message.dynamic_template_data = dynamic_data
 
         sg = SendGridAPIClient(EmailConfig.SENDGRID_API_KEY)
         response = sg.send(message)
 
         if response.status_code in [200, 202]:
-            mark_email_sent(booking['booking_id'], 'pre_arrival')
-            return True, f"Pre-arrival email sent to {guest_email}"
+            mark_email_sent(booking['booking_id'], email_type)
+            return True, f"{success_prefix} email sent to {guest_email}"
         else:
             return False, f"SendGrid error: {response.status_code}"
 
@@ -586,64 +689,22 @@ def send_pre_arrival_email(booking):
         return False, f"Error: {str(e)}"
 
 
-def send_post_play_email(booking):
-    """Send post-play thank you email"""
-    try:
-        if not EmailConfig.SENDGRID_API_KEY or not EmailConfig.FROM_EMAIL or not EmailConfig.TEMPLATE_POST_PLAY:
-            return False, "SendGrid not configured"
-
-        if not booking.get('booking_id') or not booking.get('guest_email') or not booking.get('play_date'):
-            return False, "Missing required booking fields"
-
-        # Clean email address (remove mailto: prefix if present)
-        guest_email = clean_email_address(booking['guest_email'])
-        if not guest_email:
-            return False, "Invalid email address"
-
-        guest_name = booking.get('guest_name') or guest_email.split('@')[0].title()
-
-        play_date = booking['play_date']
-        if hasattr(play_date, 'strftime'):
-            formatted_date = play_date.strftime('%A, %B %d, %Y')
-        else:
-            formatted_date = str(play_date)
-
-        tee_time_value = get_tee_time_from_booking(booking)
-
-        dynamic_data = {
-            'guest_name': guest_name,
-            'booking_date': formatted_date,
-            'course_name': booking.get('golf_courses') or 'Golf Resort',
-            'tee_time': tee_time_value,
-            'player_count': str(booking.get('players', 0)),
-            'booking_reference': booking['booking_id'],
-            'current_year': str(datetime.now().year),
-            'total': f"${booking.get('total', 0):.2f}" if booking.get('total') else '$0.00',
-        }
-
-        message = Mail(
-            from_email=(EmailConfig.FROM_EMAIL, EmailConfig.FROM_NAME),
-            to_emails=guest_email
-        )
-        message.template_id = EmailConfig.TEMPLATE_POST_PLAY
-        message.dynamic_template_data = dynamic_data
-
-        sg = SendGridAPIClient(EmailConfig.SENDGRID_API_KEY)
-        response = sg.send(message)
+def send_pre_arrival_email(booking):
+    """Send pre-arrival welcome email"""
+    return _send_templated_email(booking, EmailConfig.TEMPLATE_PRE_ARRIVAL, 'pre_arrival', 'Pre-arrival')
 
-        if response.status_code in [200, 202]:
-            mark_email_sent(booking['booking_id'], 'post_play')
-            return True, f"Post-play email sent to {guest_email}"
-        else:
-            return False, f"SendGrid error: {response.status_code}"
 
-    except Exception as e:
-        return False, f"Error: {str(e)}"
+def send_post_play_email(booking):
+    """Send post-play thank you email"""
+    return _send_templated_email(booking, EmailConfig.TEMPLATE_POST_PLAY, 'post_play', 'Post-play')
 
 
 def send_payment_request_email(booking, payment_link_url: str, amount: float, payment_type: str):
     """Send payment request email with Stripe payment link"""
     try:
+        from sendgrid import SendGridAPIClient
+        from sendgrid.helpers.mail import Mail
+
         if not EmailConfig.SENDGRID_API_KEY or not EmailConfig.FROM_EMAIL:
             return False, "SendGrid not configured"
 
@@ -655,12 +716,16 @@ def send_payment_request_email(booking, payment_link_url: str, amount: float, pa
         if not guest_email:
             return False, "Invalid email address"
 
-        # Extract guest name
-        guest_name = booking.get('guest_name', 'Guest')
+        # Extract guest name; rows from the Arrow-backed frame surface a
+        # missing name as pd.NA, which .get's key-default never catches
+        guest_name = booking.get('guest_name')
+        if guest_name is None or pd.isna(guest_name) or not str(guest_name).strip():
+            guest_name = 'Guest'
 
         # Format tee date
         tee_date = booking.get('date')
-        if tee_date and not pd.isna(tee_date):
+        # strftime check covers both None and NaT without a pandas dispatch
+        if tee_date is not None and tee_date == tee_date and hasattr(tee_date, 'strftime'):
             formatted_date = tee_date.strftime('%B %d, %Y')
         else:
             formatted_date = 'TBD'
@@ -753,11 +818,10 @@ def send_payment_request_email(booking, payment_link_url: str, amount: float, pa
 
 
 def process_pre_arrival_emails(club_filter=None, dry_run=False):
-    """Process all pending pre-arrival emails"""
+    """Queue all pending pre-arrival emails for background delivery"""
     bookings = get_upcoming_bookings_for_email(club_filter=club_filter)
 
-    sent_count = 0
-    failed_count = 0
+    queued_count = 0
     results = []
 
     for booking in bookings:
@@ -770,29 +834,26 @@ def process_pre_arrival_emails(club_filter=None, dry_run=False):
             })
             continue
 
-        success, message = send_pre_arrival_email(booking)
-
-        if success:
-            sent_count += 1
-        else:
-            failed_count += 1
+        # Hand the send off to the worker pool so the UI returns immediately
+        _email_dispatcher()['executor'].submit(send_pre_arrival_email, booking).add_done_callback(
+            _record_email_result(booking['booking_id']))
+        queued_count += 1
 
         results.append({
             'booking_id': booking['booking_id'],
             'email': booking['guest_email'],
-            'status': 'sent' if success else 'failed',
-            'message': message
+            'status': 'queued',
+            'message': 'Queued for background delivery'
         })
 
-    return sent_count, failed_count, results
+    return queued_count, 0, results
 
 
 def process_post_play_emails(club_filter=None, dry_run=False):
-    """Process all pending post-play emails"""
+    """Queue all pending post-play emails for background delivery"""
     bookings = get_recent_bookings_for_email(club_filter=club_filter)
 
-    sent_count = 0
-    failed_count = 0
+    queued_count = 0
     results = []
 
     for booking in bookings:
@@ -805,31 +866,31 @@ def process_post_play_emails(club_filter=None, dry_run=False):
             })
             continue
 
-        success, message = send_post_play_email(booking)
-
-        if success:
-            sent_count += 1
-        else:
-            failed_count += 1
+        # Hand the send off to the worker pool so the UI returns immediately
+        _email_dispatcher()['executor'].submit(send_post_play_email, booking).add_done_callback(
+            _record_email_result(booking['booking_id']))
+        queued_count += 1
 
         results.append({
             'booking_id': booking['booking_id'],
             'email': booking['guest_email'],
-            'status': 'sent' if success else 'failed',
-            'message': message
+            'status': 'queued',
+            'message': 'Queued for background delivery'
         })
 
-    return sent_count, failed_count, results
+    return queued_count, 0, results
 
 
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
+    import bcrypt
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 def verify_password(password: str, password_hash: str) -> bool:
     """Verify password against hash"""
+    import bcrypt
     return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
 
 def authenticate_user(username: str, password: str):
@@ -918,119 +979,212 @@ def update_last_login(user_id: int):
         st.error(f"Error updating last login: {e}")
 
 
-# ========================================
-# BOOKING STATUS HELPERS
-# ========================================
-def get_status_icon(status: str) -> str:
-    """Get timeline icon for booking status"""
-    # Icons removed - using text-based status indicators only
-    return ''
-
-
-def get_status_color(status: str) -> str:
-    """Get color class for status badge"""
-    status_map = {
-        'Inquiry': 'status-inquiry',
-        'Requested': 'status-requested',
-        'Confirmed': 'status-confirmed',
-        'Booked': 'status-booked',
-        'Rejected': 'status-rejected',
-        'Cancelled': 'status-cancelled',
-        'Pending': 'status-requested',
-    }
-    return status_map.get(status, 'status-inquiry')
+# Booking card markup, compiled once at import; the render loop fills it
+# with format_map instead of re-assembling the f-string for every card
+_CARD_TEMPLATE = (
+    "<div class='booking-card' style='background: linear-gradient(135deg, #1e3a8a 0%, #1e40af 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; margin-bottom: 0.5rem; box-shadow: 0 4px 16px rgba(59, 130, 246, 0.3); transition: all 0.3s ease;'>"
+    "<div style='display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1.25rem;'>"
+    "<div style='flex: 1;'><div style='display: flex; align-items: center;'><div class='booking-id' style='margin-bottom: 0.5rem;'>{booking_id}</div>{hotel_badge}</div>"
+    "<div class='booking-email'>{guest_email}</div></div>"
+    "<div style='text-align: right;'><div class='timestamp'>REQUESTED</div><div class='timestamp-value'>{requested_time}</div></div></div>"
+    "<div style='margin-bottom: 1.5rem;'>{progress_html}</div>"
+    "<div style='height: 1px; background: linear-gradient(90deg, transparent, #3b82f6, transparent); margin: 1.5rem 0;'></div>"
+    "<div style='display: grid; grid-template-columns: repeat(4, 1fr); gap: 1.5rem; margin-bottom: 1rem;'>"
+    "<div><div class='data-label' style='margin-bottom: 0.5rem;'>TEE DATE</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{tee_date_display}</div></div>"
+    "<div><div class='data-label' style='margin-bottom: 0.5rem;'>TEE TIME</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{tee_time_display}</div></div>"
+    "<div><div class='data-label' style='margin-bottom: 0.5rem;'>PLAYERS</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{players}</div></div>"
+    "<div><div class='data-label' style='margin-bottom: 0.5rem;'>TOTAL</div><div style='font-size: 1.5rem; font-weight: 700; color: #10b981;'>€{total:,.2f}</div></div></div>"
+    "{golf_info_html}{hotel_dates_html}</div>"
+)
 
+# Sub-templates for the per-card sections, also compiled once at import.
+# The loop fills them via format_map so only the variable text is built
+# per row, not the long constant style strings.
+_TERMINAL_PROGRESS_TMPL = (
+    "<div style='background: #1e3a8a; padding: 1rem; border-radius: 8px; border: 2px solid #10b981;'>"
+    "<div style='display: flex; align-items: center; justify-content: center; gap: 0.75rem;'>"
+    "<div style='width: 12px; height: 12px; border-radius: 50%; background: {status_color};'></div>"
+    "<span style='color: {status_color}; font-weight: 700; font-size: 1rem; text-transform: uppercase; letter-spacing: 0.5px;'>{current_status}</span>"
+    "</div></div>"
+)
 
-def generate_status_progress_bar(current_status: str) -> str:
-    """Generate a linear status progress bar showing booking workflow"""
+_STAGE_NODE_TMPL = (
+    "<div style='display: flex; flex-direction: column; align-items: center; z-index: 3; position: relative;'>"
+    "<div style='width: 1.5rem; height: 1.5rem; border-radius: 50%; background: {bg_color}; border: 3px solid {border_color}; box-shadow: {box_shadow}; transition: all 0.3s ease;'></div>"
+    "<div style='margin-top: 0.5rem; font-size: 0.7rem; font-weight: {font_weight}; color: {text_color}; text-transform: uppercase; letter-spacing: 0.5px; white-space: nowrap;'>{name}</div>"
+    "</div>"
+)
+
+_PROGRESS_BAR_TMPL = (
+    "<div style='background: #1e3a8a; padding: 1.25rem; border-radius: 8px; border: 2px solid #10b981;'>"
+    "<div style='display: flex; align-items: center; justify-content: space-between; position: relative;'>"
+    "<div style='position: absolute; top: 0.75rem; left: 2rem; right: 2rem; height: 3px; background: #1e40af; z-index: 1;'></div>"
+    "<div style='position: absolute; top: 0.75rem; left: 2rem; width: calc({progress_width}% - 2rem); height: 3px; background: linear-gradient(90deg, #3b82f6, #10b981); z-index: 2;'></div>"
+    "{stages_html}</div></div>"
+)
+
+_HOTEL_BADGE_HTML = (
+    "<div style='display: inline-block; background: #f59e0b; color: #ffffff; padding: 0.4rem 0.8rem; border-radius: 6px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-left: 0.5rem;'>Hotel Required</div>"
+)
+
+_HOTEL_DATES_TMPL = (
+    "<div style='background: #f59e0b; padding: 1rem; border-radius: 8px; margin-top: 1rem;'>"
+    "<div style='color: #ffffff; font-weight: 700; font-size: 0.75rem; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.75rem;'>Hotel Accommodation</div>"
+    "<div style='display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;'>"
+    "<div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Check-In</div>"
+    "<div style='color: #ffffff; font-size: 0.95rem; font-weight: 700;'>{checkin_str}</div></div>"
+    "<div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Check-Out</div>"
+    "<div style='color: #ffffff; font-size: 0.95rem; font-weight: 700;'>{checkout_str}</div></div></div></div>"
+)
+
+def _build_card_progress_html(status: str) -> str:
+    """Render the booking-card progress bar for one status."""
+    if status in ('Rejected', 'Cancelled'):
+        return _TERMINAL_PROGRESS_TMPL.format_map({
+            'status_color': '#ef4444' if status == 'Rejected' else '#64748b',
+            'current_status': status,
+        })
 
-    # Define the workflow stages - TeeMail colors
     stages = [
         {'name': 'Inquiry', 'color': '#3b82f6'},
         {'name': 'Requested', 'color': '#fbbf24'},
         {'name': 'Confirmed', 'color': '#a78bfa'},
         {'name': 'Booked', 'color': '#10b981'}
     ]
+    current_index = next((i for i, s in enumerate(stages) if s['name'] == status), 0)
+    progress_width = (current_index / (len(stages) - 1)) * 100
+
+    stages_html = "".join(
+        _STAGE_NODE_TMPL.format_map({
+            'bg_color': stage['color'] if i <= current_index else '#1e40af',
+            'text_color': '#f9fafb' if i <= current_index else '#64748b',
+            'border_color': stage['color'] if i == current_index
+                else ('#3b82f6' if i <= current_index else '#1e40af'),
+            'box_shadow': '0 0 0 4px rgba(59, 130, 246, 0.4)' if i == current_index else 'none',
+            'font_weight': '700' if i == current_index else '600',
+            'name': stage['name'],
+        })
+        for i, stage in enumerate(stages)
+    )
+    return _PROGRESS_BAR_TMPL.format_map({
+        'progress_width': progress_width,
+        'stages_html': stages_html,
+    })
 
-    # Handle special cases
-    if current_status == 'Pending':
-        current_status = 'Inquiry'
-
-    # Check if rejected or cancelled
-    is_rejected = current_status == 'Rejected'
-    is_cancelled = current_status == 'Cancelled'
-
-    if is_rejected or is_cancelled:
-        status_color = '#ef4444' if is_rejected else '#ffffff'
-        return f"""
-        <div style='background: #059669; padding: 1rem; border-radius: 8px; border: 2px solid #10b981;'>
-            <div style='display: flex; align-items: center; justify-content: center; gap: 0.75rem;'>
-                <div style='width: 12px; height: 12px; border-radius: 50%; background: {status_color};'></div>
-                <span style='color: {status_color}; font-weight: 700; font-size: 1rem; text-transform: uppercase; letter-spacing: 0.5px;'>{current_status}</span>
-            </div>
-        </div>
-        """
-
-    # Find current stage index
-    current_index = next((i for i, s in enumerate(stages) if s['name'] == current_status), 0)
-
-    # Generate HTML
-    html = """
-    <div style='background: #059669; padding: 1.25rem; border-radius: 8px; border: 2px solid #10b981;'>
-        <div style='display: flex; align-items: center; justify-content: space-between; position: relative;'>
-    """
-
-    # Add connecting line
-    html += """
-        <div style='position: absolute; top: 0.75rem; left: 2rem; right: 2rem; height: 3px; background: #1e293b; z-index: 1;'></div>
-    """
 
-    # Add progress line (only up to current stage)
-    progress_width = (current_index / (len(stages) - 1)) * 100 if len(stages) > 1 else 0
-    html += f"""
-        <div style='position: absolute; top: 0.75rem; left: 2rem; width: calc({progress_width}% - 2rem); height: 3px; background: linear-gradient(90deg, #3b82f6, #10b981); z-index: 2;'></div>
-    """
+# Only a handful of statuses exist, so the card progress bar is rendered
+# once per status at import and looked up per row ('Pending' is shown as
+# 'Inquiry' by the render loop)
+_CARD_PROGRESS_HTML = {
+    status: _build_card_progress_html(status)
+    for status in ('Inquiry', 'Requested', 'Confirmed', 'Booked', 'Rejected', 'Cancelled')
+}
+
+
+# Inbound email card rendered as plain HTML with a native <details>
+# element for the body, so a whole email list is one markdown blob
+# instead of several widgets per email
+_EMAIL_CARD_TMPL = (
+    "<div style='background: #2d3e50; padding: 0.75rem; border-radius: 6px; margin-bottom: 0.5rem; border-left: 3px solid {status_color};'>"
+    "<div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 0.5rem;'>"
+    "<div style='flex: 1;'>"
+    "<div style='color: #f9fafb; font-weight: 600; font-size: 0.875rem;'>{subject}</div>"
+    "<div style='color: #3b82f6; font-size: 0.75rem; margin-top: 0.25rem;'>From: {from_email}</div>"
+    "</div></div>"
+    "<div style='display: flex; gap: 0.5rem; align-items: center; flex-wrap: wrap;'>"
+    "<div style='background: {email_type_color}20; border: 1px solid {email_type_color}; color: {email_type_color}; padding: 0.25rem 0.5rem; border-radius: 4px; font-weight: 600; font-size: 0.65rem; text-transform: uppercase;'>{email_type}</div>"
+    "<div style='background: {status_color}20; border: 1px solid {status_color}; color: {status_color}; padding: 0.25rem 0.5rem; border-radius: 4px; font-weight: 600; font-size: 0.65rem; text-transform: uppercase;'>{status_text}</div>"
+    "<div style='color: #64748b; font-size: 0.7rem; margin-left: auto;'>{received_at}</div>"
+    "</div>"
+    "<details style='margin-top: 0.5rem;'>"
+    "<summary style='color: #94a3b8; font-size: 0.75rem; cursor: pointer;'>Email Body</summary>"
+    "<pre style='white-space: pre-wrap; color: #e2e8f0; font-size: 0.75rem; background: #1e293b; padding: 0.5rem; border-radius: 4px; margin-top: 0.25rem;'>{body}</pre>"
+    "</details>"
+    "<div style='color: #64748b; font-size: 0.65rem; margin-top: 0.25rem;'>📧 Message ID: {message_id}...{processing_html}</div>"
+    "{error_html}"
+    "</div>"
+)
 
-    # Add stage nodes
-    for i, stage in enumerate(stages):
-        is_active = i <= current_index
-        is_current = i == current_index
-
-        bg_color = stage['color'] if is_active else '#1e293b'
-        text_color = '#ffffff' if is_active else '#ffffff'
-        border_color = stage['color'] if is_current else ('#10b981' if is_active else '#1e293b')
-        box_shadow = '0 0 0 4px rgba(16, 185, 129, 0.4)' if is_current else 'none'
-
-        html += f"""
-        <div style='display: flex; flex-direction: column; align-items: center; z-index: 3; position: relative;'>
-            <div style='
-                width: 1.5rem;
-                height: 1.5rem;
-                border-radius: 50%;
-                background: {bg_color};
-                border: 3px solid {border_color};
-                box-shadow: {box_shadow};
-                transition: all 0.3s ease;
-            '>
-            </div>
-            <div style='
-                margin-top: 0.5rem;
-                font-size: 0.7rem;
-                font-weight: {('700' if is_current else '600')};
-                color: {text_color};
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-                white-space: nowrap;
-            '>{stage['name']}</div>
-        </div>
-        """
+# Static section dividers and labels reused across the page, built once
+# at import instead of inline per card per rerun
+_PAGE_DIVIDER_HTML = "<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>"
+_EXPORT_DIVIDER_HTML = "<div style='height: 2px; background: #6b7c3f; margin: 2rem 0;'></div>"
+_SECTION_DIVIDER_HTML = "<div style='margin-top: 1.5rem; border-top: 2px solid #3b82f6; padding-top: 1rem;'></div>"
+_DANGER_ZONE_HTML = (
+    "<div style='margin-top: 1.5rem; border-top: 2px solid #6b7c3f; padding-top: 1rem;'></div>"
+    "<div style='color: #cc8855; font-weight: 600; font-size: 0.875rem; margin-bottom: 0.5rem;'>Danger Zone</div>"
+)
+_CUSTOMER_TYPE_HEADER_HTML = (
+    "<div style='background: #1e3a8a; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem; border: 2px solid #fbbf24;'>"
+    "<div style='color: #fbbf24; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>Customer Type</div>"
+    "</div>"
+)
+_PAYMENT_REQUEST_HEADER_HTML = (
+    "<div style='background: #10b981; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem;'>"
+    "<div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>💳 Payment Request</div>"
+    "</div>"
+)
 
-    html += """
-        </div>
+# Booking cards rendered per page of the list view
+_PAGE_SIZE = 20
+
+# Status options for the change-status dropdown, with a precomputed
+# position map so the loop avoids a linear .index() scan per card
+_ALL_STATUSES = ('Inquiry', 'Requested', 'Confirmed', 'Booked', 'Rejected', 'Cancelled')
+_STATUS_INDEX = {s: i for i, s in enumerate(_ALL_STATUSES)}
+
+# Payment panels filled per card via format_map, parsed once at import
+# instead of re-building the f-string literal each iteration
+_PAY_STATUS_TMPL = """
+    <div style='background: #1e3a8a; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem; border: 2px solid {status_color};'>
+        <div style='color: #f9fafb; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>Payment Status</div>
+        <div style='color: {status_color}; font-size: 1rem; font-weight: 700; margin-top: 0.5rem;'>{status_text}</div>
+        <div style='color: #ffffff; font-size: 0.875rem; margin-top: 0.5rem;'>Paid: €{total_paid:.2f} / €{total:.2f}</div>
+        <div style='color: #94a3b8; font-size: 0.75rem; margin-top: 0.25rem;'>Deposit: {deposit_percentage}%</div>
     </div>
-    """
+"""
 
-    return html
+_PAY_AMOUNT_TMPL = """
+    <div style='text-align: center; padding: 0.5rem; background: #1e3a8a; border-radius: 6px; margin-bottom: 0.75rem;'>
+        <div style='color: #94a3b8; font-size: 0.75rem;'>Amount to Request</div>
+        <div style='color: #10b981; font-size: 1.5rem; font-weight: 700;'>€{payment_amount:.2f}</div>
+    </div>
+"""
+
+# Payment-status lookups shared by every booking card
+_PAYMENT_STATUS_COLORS = {
+    'not_requested': '#64748b',
+    'pending': '#fbbf24',
+    'deposit_paid': '#3b82f6',
+    'fully_paid': '#10b981',
+    'failed': '#ef4444'
+}
+
+_PAYMENT_STATUS_TEXT = {
+    'not_requested': 'Not Requested',
+    'pending': 'Payment Pending',
+    'deposit_paid': 'Deposit Paid',
+    'fully_paid': 'Fully Paid',
+    'failed': 'Payment Failed'
+}
+
+_EMAIL_TYPE_COLORS = {
+    'inquiry': '#3b82f6',
+    'booking_request': '#8b5cf6',
+    'staff_confirmation': '#10b981',
+    'waitlist_optin': '#f59e0b',
+    'customer_reply': '#6366f1',
+}
+
+_GOLF_INFO_TMPL = (
+    "<div style='background: #10b981; padding: 1rem; border-radius: 8px; margin-top: 1rem;'>"
+    "<div style='color: #ffffff; font-weight: 700; font-size: 0.75rem; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.75rem;'>Golf Courses & Tee Times</div>"
+    "<div style='display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;'>"
+    "<div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Courses</div>"
+    "<div style='color: #ffffff; font-size: 0.875rem; font-weight: 600; line-height: 1.5;'>{courses_list}</div></div>"
+    "<div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Tee Times</div>"
+    "<div style='color: #ffffff; font-size: 0.875rem; font-weight: 600; line-height: 1.5;'>{times_list}</div></div></div></div>"
+)
 
 
 # ========================================
@@ -1066,19 +1220,11 @@ def logout():
 
 
 # ========================================
-# STREAMLIT PAGE CONFIG
-# ========================================
-st.set_page_config(
-    page_title="TeeMail Demo Dashboard",
-    page_icon="📧",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# ========================================
-# STYLING - TEEMAIL DEMO BRAND
+# STATIC STYLESHEETS
 # ========================================
-st.markdown("""
+# Hoisted to module constants so the strings are built once at import
+# instead of being re-assembled on every script rerun
+_MAIN_CSS = """
     <style>
     .main {
         background: #0a0e1a;
@@ -1359,14 +1505,9 @@ st.markdown("""
     footer {visibility: hidden;} 
     header {visibility: hidden;}
     </style>
-""", unsafe_allow_html=True)
+"""
 
-
-# ========================================
-# PASSWORD CHANGE SCREEN
-# ========================================
-if st.session_state.show_password_change:
-    st.markdown("""
+_PWD_CSS = """
         <style>
         .password-container {
             max-width: 500px;
@@ -1391,14 +1532,80 @@ if st.session_state.show_password_change:
             font-size: 0.95rem;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """
 
-    st.markdown("""
+_LOGIN_CSS = """
+        <style>
+        .login-logo-container {
+            text-align: center;
+            margin-top: 80px;
+            margin-bottom: 2rem;
+        }
+        .login-subtitle {
+            color: #ffffff;
+            text-align: center;
+            margin-bottom: 3rem;
+            font-size: 1.1rem;
+            font-weight: 500;
+        }
+        </style>
+    """
+
+
+@st.cache_resource
+def _stylesheet(css: str) -> str:
+    """Return a stylesheet blob, cached so it is materialized once per process"""
+    return css
+
+
+_LOGO_URL = 'https://raw.githubusercontent.com/jimbobirecode/TeeMail-Assests/main/output-onlinepngtools.png'
+
+
+@st.cache_resource
+def _login_logo_src() -> str:
+    """Fetch the logo once and inline it as a data URI.
+
+    Saves the browser a GitHub round trip on every login rerun; falls
+    back to the remote URL if the fetch fails.
+    """
+    try:
+        import base64
+        resp = requests.get(_LOGO_URL, timeout=5)
+        resp.raise_for_status()
+        encoded = base64.b64encode(resp.content).decode('ascii')
+        return f'data:image/png;base64,{encoded}'
+    except Exception:
+        return _LOGO_URL
+
+
+# ========================================
+# STREAMLIT PAGE CONFIG
+# ========================================
+st.set_page_config(
+    page_title="TeeMail Demo Dashboard",
+    page_icon="📧",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# ========================================
+# STYLING - TEEMAIL DEMO BRAND
+# ========================================
+# Injected before the auth gate so the login and password screens keep
+# the dark background their white-text stylesheets assume; the blob is
+# cached, so unauthenticated reruns pay nothing extra
+st.html(_stylesheet(_MAIN_CSS))
+
+# ========================================
+# PASSWORD CHANGE SCREEN
+# ========================================
+if st.session_state.show_password_change:
+    st.html(_stylesheet(_PWD_CSS) + """
         <div class="password-container">
             <div class="password-title">Set Your Password</div>
             <div class="password-subtitle">First-time setup - create your secure password</div>
         </div>
-    """, unsafe_allow_html=True)
+    """)
     
     with st.form("password_setup_form"):
         st.info(f"Welcome, **{st.session_state.full_name}**! Please create a secure password for your account.")
@@ -1440,196 +1647,179 @@ if st.session_state.show_password_change:
 # LOGIN SCREEN
 # ========================================
 if not st.session_state.authenticated:
-    st.markdown("""
-        <style>
-        .login-logo-container {
-            text-align: center;
-            margin-top: 80px;
-            margin-bottom: 2rem;
-        }
-        .login-subtitle {
-            color: #ffffff;
-            text-align: center;
-            margin-bottom: 3rem;
-            font-size: 1.1rem;
-            font-weight: 500;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
-    # Center the logo
-    st.markdown("""
-        <div style='display: flex; justify-content: center; align-items: center;'>
-            <img src='https://raw.githubusercontent.com/jimbobirecode/TeeMail-Assests/main/output-onlinepngtools.png' width='300' style='display: block; margin: 0 auto;'/>
-        </div>
-    """, unsafe_allow_html=True)
+    # Render the whole screen inside one placeholder container so the
+    # rendered subtree stays stable across reruns while typing
+    _login_slot = st.empty()
+    with _login_slot.container():
+        # st.html skips the markdown parser entirely for static HTML; the
+        # stylesheet, centered logo and subtitle go out as a single element
+        st.html(_stylesheet(_LOGIN_CSS) + f"""
+            <div style='display: flex; justify-content: center; align-items: center;'>
+                <img src='{_login_logo_src()}' width='300' style='display: block; margin: 0 auto;'/>
+            </div>
+            <div class="login-subtitle">Booking Management System</div>
+        """)
 
-    st.markdown("""
-        <div class="login-subtitle">Booking Management System</div>
-    """, unsafe_allow_html=True)
-    
-    with st.form("login_form"):
-        username = st.text_input("Username", key="login_username")
-        password = st.text_input("Password", type="password", key="login_password")
-        submit = st.form_submit_button("Login", use_container_width=True)
+        with st.form("login_form"):
+            username = st.text_input("Username", key="login_username")
+            password = st.text_input("Password", type="password", key="login_password")
+            submit = st.form_submit_button("Login", use_container_width=True)
         
-        if submit:
-            if username and password:
-                success, customer_id, full_name, must_change, user_id = authenticate_user(username, password)
+            if submit:
+                if username and password:
+                    success, customer_id, full_name, must_change, user_id = authenticate_user(username, password)
                 
-                if success:
-                    st.session_state.authenticated = True
-                    st.session_state.customer_id = customer_id
-                    st.session_state.username = username
-                    st.session_state.full_name = full_name
-                    st.session_state.user_id = user_id
-
-                    if must_change:
-                        st.session_state.must_change_password = True
-                        st.session_state.show_password_change = True
-                        st.success("Please set your password...")
-                        st.rerun()
+                    if success:
+                        st.session_state.authenticated = True
+                        st.session_state.customer_id = customer_id
+                        st.session_state.username = username
+                        st.session_state.full_name = full_name
+                        st.session_state.user_id = user_id
+
+                        if must_change:
+                            st.session_state.must_change_password = True
+                            st.session_state.show_password_change = True
+                            st.success("Please set your password...")
+                            st.rerun()
+                        else:
+                            update_last_login(user_id)
+                            st.success("Login successful!")
+                            st.rerun()
                     else:
-                        update_last_login(user_id)
-                        st.success("Login successful!")
-                        st.rerun()
+                        st.error("Invalid username or password")
                 else:
-                    st.error("Invalid username or password")
-            else:
-                st.error("Please enter username and password")
-    
-    st.markdown("""
-        <div style='text-align: center; color: #ffffff; font-size: 0.85rem; margin-top: 2rem;'>
-            <p>First time? Use your temporary password</p>
-        </div>
-    """, unsafe_allow_html=True)
+                    st.error("Please enter username and password")
     
+        st.html("""
+            <div style='text-align: center; color: #ffffff; font-size: 0.85rem; margin-top: 2rem;'>
+                <p>First time? Use your temporary password</p>
+            </div>
+        """)
+
     st.stop()
 
 
 # ========================================
 # LOAD BOOKINGS
 # ========================================
-@st.cache_data(ttl=10)
+# Default values applied to the booking frame in a single fillna pass
+_COLUMN_DEFAULTS = {
+    'tee_time': 'Not Specified',
+    'note': 'No additional information provided',
+    'status': 'Inquiry',
+    'players': 1,
+    'total': 0.0,
+    'guest_email': 'No email provided',
+    'guest_name': '',
+    'hotel_required': False,
+    'golf_courses': '',
+    'selected_tee_times': '',
+}
+
+# Column order must match the SELECT list in load_bookings_from_db
+_BOOKING_COLS = (
+    'booking_id', 'guest_email', 'guest_name', 'date', 'tee_time', 'players',
+    'total', 'status', 'note', 'club', 'timestamp',
+    'updated_at', 'updated_by',
+    'hotel_required', 'hotel_checkin', 'hotel_checkout',
+    'golf_courses', 'selected_tee_times',
+    'is_tour_operator', 'payment_status', 'deposit_percentage', 'total_paid',
+)
+
+
+# cache_resource keeps the frame as a shared singleton (global across
+# sessions) and skips cache_data's pickle round-trip on every hit;
+# mutating helpers call load_bookings_from_db.clear() to invalidate,
+# and the TTL bounds staleness for writes made outside the dashboard
+@st.cache_resource(ttl=60)
 def load_bookings_from_db(club_filter):
     """Load bookings directly from PostgreSQL database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(row_factory=dict_row)
-
-        cursor.execute("""
-            SELECT
-                id, booking_id, guest_email, date, tee_time, players, total,
-                status, note, club, timestamp, customer_confirmed_at,
-                updated_at, updated_by, created_at,
-                hotel_required, hotel_checkin, hotel_checkout,
-                golf_courses, selected_tee_times,
-                is_tour_operator, payment_status, deposit_percentage, total_paid
-            FROM bookings
-            WHERE club = %s
-            ORDER BY timestamp DESC
-        """, (club_filter,))
-
-        bookings = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn:
+            # Plain tuple cursor: building the frame from records with an
+            # explicit column list avoids allocating one dict per row
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT
+                        booking_id, guest_email, guest_name, date, tee_time, players,
+                        total, status, note, club, timestamp,
+                        updated_at, updated_by,
+                        hotel_required, hotel_checkin, hotel_checkout,
+                        golf_courses, selected_tee_times,
+                        is_tour_operator, payment_status, deposit_percentage, total_paid
+                    FROM bookings
+                    WHERE club = %s
+                    ORDER BY timestamp DESC
+                """, (club_filter,))
+
+                bookings = cursor.fetchall()
 
         if not bookings:
             return pd.DataFrame(), 'postgresql'
 
-        df = pd.DataFrame(bookings)
+        df = pd.DataFrame.from_records(bookings, columns=_BOOKING_COLS)
 
-        # Ensure all datetime columns are properly converted
-        for col in ['timestamp', 'customer_confirmed_at', 'updated_at', 'created_at', 'hotel_checkin', 'hotel_checkout']:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-
-        # Ensure tee_time exists and handle None/NaN values
-        if 'tee_time' not in df.columns:
-            df['tee_time'] = 'Not Specified'
-        else:
-            df['tee_time'] = df['tee_time'].fillna('Not Specified')
-
-        # Extract tee times from note content if not already set
-        for idx in df.index:
-            current_tee_time = df.at[idx, 'tee_time']
-            if current_tee_time in ['Not Specified', None, ''] or pd.isna(current_tee_time):
-                note_content = df.at[idx, 'note']
-                extracted_time = extract_tee_time_from_note(note_content)
-                if extracted_time:
-                    df.at[idx, 'tee_time'] = extracted_time
-
-        # Ensure note column exists and handle None/NaN
-        if 'note' not in df.columns:
-            df['note'] = 'No additional information provided'
-        else:
-            df['note'] = df['note'].fillna('No additional information provided')
-
-        # Ensure all required columns have proper defaults
-        if 'status' not in df.columns:
-            df['status'] = 'Inquiry'
-
-        if 'players' not in df.columns:
-            df['players'] = 1
-        else:
-            df['players'] = df['players'].fillna(1)
-
-        if 'total' not in df.columns:
-            df['total'] = 0.0
-        else:
-            df['total'] = df['total'].fillna(0.0)
+        # Ensure all datetime columns are properly converted; psycopg
+        # already returns typed datetimes, so skip columns pandas has
+        # recognized and only parse the ones that arrived as strings
+        for col in ['date', 'timestamp', 'updated_at', 'hotel_checkin', 'hotel_checkout']:
+            if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = pd.to_datetime(df[col], errors='coerce', cache=True)
 
-        if 'guest_email' not in df.columns:
-            df['guest_email'] = 'No email provided'
-        else:
-            df['guest_email'] = df['guest_email'].fillna('No email provided')
+        # Add any missing columns and apply all defaults in one pass
+        df = df.reindex(columns=df.columns.union(_COLUMN_DEFAULTS.keys(), sort=False))
+        df.fillna(_COLUMN_DEFAULTS, inplace=True)
 
         if 'booking_id' not in df.columns:
-            df['booking_id'] = df.index.map(lambda x: f'BOOK-{x:04d}')
-
-        # Ensure hotel_required column exists with default False
-        if 'hotel_required' not in df.columns:
-            df['hotel_required'] = False
-        else:
-            df['hotel_required'] = df['hotel_required'].fillna(False)
-
-        # Ensure golf_courses and selected_tee_times columns exist
-        if 'golf_courses' not in df.columns:
-            df['golf_courses'] = ''
-        else:
-            df['golf_courses'] = df['golf_courses'].fillna('')
-
-        if 'selected_tee_times' not in df.columns:
-            df['selected_tee_times'] = ''
-        else:
-            df['selected_tee_times'] = df['selected_tee_times'].fillna('')
+            df['booking_id'] = 'BOOK-' + df.index.astype(str).str.zfill(4)
+
+        # Extract tee times from note content if not already set, using
+        # the precompiled pattern through pandas' C-level str.extract
+        missing = df['tee_time'].isin(['Not Specified', ''])
+        if missing.any():
+            extracted = (
+                df.loc[missing, 'note'].astype(str)
+                .str.extract(_TEE_TIME_RE, expand=False)
+                .str.strip().str.upper()
+            )
+            df.loc[missing, 'tee_time'] = extracted.fillna('Not Specified')
+
+        # Downcast numerics and use categoricals for low-cardinality
+        # strings; the cached frame shrinks severalfold
+        df['players'] = df['players'].astype('int16')
+        df['total'] = df['total'].astype('float32')
+        df['deposit_percentage'] = df['deposit_percentage'].astype('float32')
+        df['hotel_required'] = df['hotel_required'].astype(bool)
+        for col in ('status', 'club', 'payment_status', 'golf_courses'):
+            df[col] = df[col].astype('category')
+
+        # Arrow-backed strings for the searched free-text columns: the
+        # search blob's str ops dispatch to Arrow's vectorized kernels
+        # instead of Python object arrays (golf_courses stays categorical)
+        for col in ('guest_email', 'guest_name', 'booking_id', 'note'):
+            df[col] = df[col].astype('string[pyarrow]')
 
         return df, 'postgresql'
     except Exception as e:
+        # Log the full traceback; keep the user-facing message short so
+        # the error path stays cheap during cascading DB failures
+        logger.exception("load_bookings_from_db failed")
         st.error(f"Database error: {e}")
-        import traceback
-        st.error(f"Details: {traceback.format_exc()}")
         return pd.DataFrame(), 'error'
 
 
 def update_booking_status(booking_id: str, new_status: str, updated_by: str):
     """Update booking status in database and return True to trigger filter adjustment"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE bookings
-            SET status = %s, updated_at = NOW(), updated_by = %s
-            WHERE booking_id = %s;
-        """, (new_status, updated_by, booking_id))
+        with get_pool().connection() as conn:
+            conn.execute("""
+                UPDATE bookings
+                SET status = %s, updated_at = NOW(), updated_by = %s
+                WHERE booking_id = %s;
+            """, (new_status, updated_by, booking_id))
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        # Invalidate the cached frame so the change shows immediately
+        load_bookings_from_db.clear()
 
         # Store the new status in session state to auto-include in filter
         if 'auto_include_status' not in st.session_state:
@@ -1645,18 +1835,14 @@ def update_booking_status(booking_id: str, new_status: str, updated_by: str):
 def update_booking_tee_time(booking_id: str, tee_time: str):
     """Update booking tee_time in database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE bookings
-            SET tee_time = %s, updated_at = NOW()
-            WHERE booking_id = %s;
-        """, (tee_time, booking_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn:
+            conn.execute("""
+                UPDATE bookings
+                SET tee_time = %s, updated_at = NOW()
+                WHERE booking_id = %s;
+            """, (tee_time, booking_id))
+
+        load_bookings_from_db.clear()
         return True
     except Exception as e:
         st.error(f"Error updating tee time: {e}")
@@ -1664,70 +1850,67 @@ def update_booking_tee_time(booking_id: str, tee_time: str):
 
 
 def fix_all_tee_times(club_filter):
-    """Extract and update tee times for all bookings with missing tee times"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(row_factory=dict_row)
-
-        # Get all bookings with missing or "Not Specified" tee times
-        cursor.execute("""
-            SELECT id, booking_id, note, tee_time
-            FROM bookings
-            WHERE club = %s
-              AND (tee_time IS NULL OR tee_time = 'Not Specified' OR tee_time = '');
-        """, (club_filter,))
+    """Extract and update tee times for all bookings with missing tee times.
 
-        bookings = cursor.fetchall()
-
-        if not bookings:
-            cursor.close()
-            conn.close()
-            return 0, 0
-
-        updated_count = 0
-        not_found_count = 0
-
-        for booking in bookings:
-            note = booking['note']
-            extracted_time = extract_tee_time_from_note(note)
-
-            if extracted_time:
-                # Update the booking
+    Generator: yields (processed, total, updated, not_found) as it scans
+    so the caller can stream progress into st.status instead of sitting
+    behind a blank spinner; the final yield carries the totals.
+    """
+    try:
+        with get_pool().connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cursor:
+                # Get all bookings with missing or "Not Specified" tee times
                 cursor.execute("""
-                    UPDATE bookings
-                    SET tee_time = %s, updated_at = NOW()
-                    WHERE id = %s;
-                """, (extracted_time, booking['id']))
-                updated_count += 1
-            else:
-                not_found_count += 1
+                    SELECT id, booking_id, note, tee_time
+                    FROM bookings
+                    WHERE club = %s
+                      AND (tee_time IS NULL OR tee_time = 'Not Specified' OR tee_time = '');
+                """, (club_filter,))
+
+                bookings = cursor.fetchall()
+
+                if not bookings:
+                    yield 0, 0, 0, 0
+                    return
+
+                # Extract in Python, then push all updates in one batched round trip
+                total = len(bookings)
+                updates = []
+                not_found_count = 0
+
+                for processed, booking in enumerate(bookings, 1):
+                    extracted_time = extract_tee_time_from_note(booking['note'])
+                    if extracted_time:
+                        updates.append((extracted_time, booking['id']))
+                    else:
+                        not_found_count += 1
+                    if processed % 25 == 0:
+                        yield processed, total, len(updates), not_found_count
 
-        # Commit all updates
-        conn.commit()
-        cursor.close()
-        conn.close()
+                if updates:
+                    cursor.executemany("""
+                        UPDATE bookings
+                        SET tee_time = %s, updated_at = NOW()
+                        WHERE id = %s;
+                    """, updates)
 
-        return updated_count, not_found_count
+        yield total, total, len(updates), not_found_count
 
     except Exception as e:
         st.error(f"Error fixing tee times: {e}")
-        return 0, 0
+        yield 0, 0, 0, 0
 
 
 def delete_booking(booking_id: str):
     """Delete a booking from the database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            DELETE FROM bookings
-            WHERE booking_id = %s;
-        """, (booking_id,))
+        with get_pool().connection() as conn:
+            conn.execute("""
+                DELETE FROM bookings
+                WHERE booking_id = %s;
+            """, (booking_id,))
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        load_bookings_from_db.clear()
         return True
     except Exception as e:
         st.error(f"Error deleting booking: {e}")
@@ -1737,18 +1920,14 @@ def delete_booking(booking_id: str):
 def update_booking_note(booking_id: str, note: str):
     """Update booking note in database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE bookings
-            SET note = %s, updated_at = NOW()
-            WHERE booking_id = %s;
-        """, (note, booking_id))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with get_pool().connection() as conn:
+            conn.execute("""
+                UPDATE bookings
+                SET note = %s, updated_at = NOW()
+                WHERE booking_id = %s;
+            """, (note, booking_id))
+
+        load_bookings_from_db.clear()
         return True
     except Exception as e:
         st.error(f"Error updating note: {e}")
@@ -1758,29 +1937,31 @@ def update_booking_note(booking_id: str, note: str):
 # ========================================
 # NOTIFY PLATFORM INTEGRATION
 # ========================================
+def _build_export_frame(df):
+    """Build the Notify export columns with vectorized pandas ops"""
+    return pd.DataFrame({
+        'booking_id': df['booking_id'].astype(str),
+        'customer_email': df['guest_email'].astype(str),
+        'booking_date': df['date'].dt.strftime('%Y-%m-%d').fillna(''),
+        'tee_time': df['tee_time'].astype(str),
+        'players': df['players'].fillna(1).astype(int),
+        'total_amount': df['total'].fillna(0).astype(float),
+        'status': df['status'].astype(str),
+        'golf_courses': df['golf_courses'].astype(str),
+        'hotel_required': df['hotel_required'].fillna(False).astype(bool),
+        'created_at': df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%SZ').fillna(''),
+        'club': df['club'].astype(str),
+    })
+
+
 def prepare_booking_data_for_export(df, format_type='json'):
     """
     Prepare booking data for export to Notify platform.
     Supports JSON, API-ready dict, and CSV formats.
     """
-    export_data = []
-    for _, row in df.iterrows():
-        booking_record = {
-            'booking_id': str(row.get('booking_id', '')),
-            'customer_email': str(row.get('guest_email', '')),
-            'booking_date': row['date'].strftime('%Y-%m-%d') if pd.notna(row.get('date')) else '',
-            'tee_time': str(row.get('tee_time', '')),
-            'players': int(row.get('players', 1)),
-            'total_amount': float(row.get('total', 0)),
-            'status': str(row.get('status', '')),
-            'golf_courses': str(row.get('golf_courses', '')),
-            'hotel_required': bool(row.get('hotel_required', False)),
-            'created_at': row['timestamp'].strftime('%Y-%m-%dT%H:%M:%SZ') if pd.notna(row.get('timestamp')) else '',
-            'club': str(row.get('club', ''))
-        }
-        export_data.append(booking_record)
-
-    return export_data
+    if df.empty:
+        return []
+    return _build_export_frame(df).to_dict(orient='records')
 
 
 def export_to_json(df):
@@ -1806,6 +1987,21 @@ def export_to_api_format(df):
     }
 
 
+@st.cache_resource
+def _notify_session():
+    """Shared HTTP session for Notify pushes with retries and keep-alive"""
+    from requests.adapters import HTTPAdapter, Retry
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
 def push_to_notify_api(df, api_endpoint, api_key=None):
     """
     Push booking data to external Notify platform via API.
@@ -1815,14 +2011,17 @@ def push_to_notify_api(df, api_endpoint, api_key=None):
         payload = export_to_api_format(df)
         headers = {
             'Content-Type': 'application/json',
+            'Content-Encoding': 'gzip',
             'Accept': 'application/json'
         }
         if api_key:
             headers['Authorization'] = f'Bearer {api_key}'
 
-        response = requests.post(
+        # Keep-alive session avoids a TLS handshake per push; gzip cuts
+        # the JSON payload size substantially on the wire
+        response = _notify_session().post(
             api_endpoint,
-            json=payload,
+            data=gzip.compress(json.dumps(payload).encode('utf-8')),
             headers=headers,
             timeout=30
         )
@@ -1841,19 +2040,44 @@ def push_to_notify_api(df, api_endpoint, api_key=None):
 
 def export_notify_csv(df):
     """Export booking data in CSV format optimized for Notify platform import"""
-    export_df = pd.DataFrame(prepare_booking_data_for_export(df, 'csv'))
-    return export_df.to_csv(index=False)
+    if df.empty:
+        return ''
+    return _build_export_frame(df).to_csv(index=False)
 
 
 # ========================================
 # WAITLIST MODULE FUNCTIONS
 # ========================================
+# Explicit projections: the UI only renders these columns, so SELECT *
+# would ship notification bookkeeping and other unused fields for nothing
+_WAITLIST_COLS = (
+    "waitlist_id, guest_email, guest_name, requested_date, preferred_time, "
+    "time_flexibility, players, golf_course, notes, status, priority, club, "
+    "created_at"
+)
+
+_INBOUND_EMAIL_COLS = (
+    "booking_id, from_email, to_email, subject, body_text, email_type, "
+    "processed, processing_status, error_message, message_id, received_at"
+)
+
+# Column order matches _WAITLIST_COLS; declared dtypes skip pandas'
+# per-column inference scan when building the waitlist frame
+_WAITLIST_COL_NAMES = tuple(c.strip() for c in _WAITLIST_COLS.split(','))
+_WAITLIST_DTYPES = {
+    'requested_date': 'datetime64[ns]',
+    'created_at': 'datetime64[ns]',
+    'players': 'int16',
+    'priority': 'int16',
+}
+# cache_resource runs the DDL exactly once per process; the calls on the
+# read/write paths become dictionary lookups afterwards
+@st.cache_resource
 def create_waitlist_table_if_not_exists():
     """Ensure waitlist table exists in database"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        with get_pool().connection() as conn:
+            conn.execute("""
             CREATE TABLE IF NOT EXISTS waitlist (
                 id SERIAL PRIMARY KEY,
                 waitlist_id VARCHAR(50) UNIQUE NOT NULL,
@@ -1873,44 +2097,70 @@ def create_waitlist_table_if_not_exists():
                 updated_at TIMESTAMP DEFAULT NOW(),
                 club VARCHAR(100) NOT NULL
             );
-        """)
-        conn.commit()
-        cursor.close()
-        conn.close()
+            """)
+            # Indexes backing the hot waitlist queries (list + match lookup);
+            # created alongside the table so they exist from first use
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_waitlist_club_date_prio
+                    ON waitlist (club, requested_date, priority DESC, created_at);
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_waitlist_matches
+                    ON waitlist (club, requested_date, status)
+                    WHERE status = 'Waiting';
+            """)
         return True
     except Exception as e:
         st.error(f"Error creating waitlist table: {e}")
+        # Don't let cache_resource memoize the failure - clear the entry
+        # so the next call retries the DDL instead of returning False forever
+        create_waitlist_table_if_not_exists.clear()
         return False
 
 
-def load_waitlist_from_db(club_filter):
-    """Load waitlist entries from database"""
+@st.cache_data(ttl=60, show_spinner=False)
+def load_waitlist_from_db(club_filter, date_from=None, date_to=None, statuses=None, limit=1000):
+    """Load waitlist entries from database.
+
+    Optional date range and status filters are pushed into SQL so the
+    whole club history is never shipped to pandas just to be discarded.
+    """
     try:
         create_waitlist_table_if_not_exists()
-        conn = get_db_connection()
-        cursor = conn.cursor(row_factory=dict_row)
 
-        cursor.execute("""
-            SELECT * FROM waitlist
-            WHERE club = %s
-            ORDER BY requested_date ASC, priority DESC, created_at ASC
-        """, (club_filter,))
+        where_conditions = ["club = %s"]
+        params = [club_filter]
 
-        waitlist = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        if date_from is not None:
+            where_conditions.append("requested_date >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            where_conditions.append("requested_date <= %s")
+            params.append(date_to)
+        if statuses:
+            where_conditions.append("status = ANY(%s)")
+            params.append(list(statuses))
 
-        if not waitlist:
-            return pd.DataFrame()
+        params.append(limit)
 
-        df = pd.DataFrame(waitlist)
+        with get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT {_WAITLIST_COLS} FROM waitlist
+                    WHERE {' AND '.join(where_conditions)}
+                    ORDER BY requested_date ASC, priority DESC, created_at ASC
+                    LIMIT %s
+                """, params)
 
-        # Convert date columns
-        for col in ['requested_date', 'created_at', 'updated_at', 'notification_sent_at']:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+                waitlist = cursor.fetchall()
 
-        return df
+        if not waitlist:
+            return pd.DataFrame()
+
+        # Tuple rows + declared dtypes: no per-row dicts, no inference
+        # scan, and the datetime columns convert in one astype pass
+        df = pd.DataFrame.from_records(waitlist, columns=_WAITLIST_COL_NAMES)
+        return df.astype(_WAITLIST_DTYPES, copy=False)
     except Exception as e:
         st.error(f"Error loading waitlist: {e}")
         return pd.DataFrame()
@@ -1921,52 +2171,104 @@ def add_to_waitlist(guest_email, guest_name, requested_date, preferred_time,
     """Add a new entry to the waitlist"""
     try:
         create_waitlist_table_if_not_exists()
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
-        # Generate waitlist ID
-        waitlist_id = f"WL-{datetime.now().strftime('%Y%m%d%H%M%S')}-{hash(guest_email) % 10000:04d}"
-
-        cursor.execute("""
-            INSERT INTO waitlist (
-                waitlist_id, guest_email, guest_name, requested_date, preferred_time,
-                time_flexibility, players, golf_course, notes, club, priority
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, (waitlist_id, guest_email, guest_name, requested_date, preferred_time,
-              time_flexibility, players, golf_course, notes, club, priority))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        # Generate waitlist ID; blake2b is deterministic across processes
+        # and restarts, unlike Python's randomized hash()
+        email_hash = int.from_bytes(
+            hashlib.blake2b(guest_email.encode(), digest_size=2).digest(), 'big') % 10000
+        waitlist_id = f"WL-{datetime.now().strftime('%Y%m%d%H%M%S')}-{email_hash:04d}"
+
+        with get_pool().connection() as conn:
+            conn.execute("""
+                INSERT INTO waitlist (
+                    waitlist_id, guest_email, guest_name, requested_date, preferred_time,
+                    time_flexibility, players, golf_course, notes, club, priority
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (waitlist_id, guest_email, guest_name, requested_date, preferred_time,
+                  time_flexibility, players, golf_course, notes, club, priority),
+                prepare=True)
+
+        load_waitlist_from_db.clear()
         return True, waitlist_id
     except Exception as e:
         st.error(f"Error adding to waitlist: {e}")
         return False, None
 
 
+def add_many_to_waitlist(entries):
+    """Bulk-insert waitlist entries via the COPY protocol.
+
+    Takes a list of dicts with the same fields as add_to_waitlist; COPY
+    streams all rows in one shot, bypassing per-row INSERT parsing.
+    Returns (success, list_of_waitlist_ids).
+
+    Not called from the dashboard itself: kept for bulk imports (CSV
+    backfills and operator scripts) that would otherwise loop over
+    add_to_waitlist.
+    """
+    if not entries:
+        return True, []
+
+    try:
+        create_waitlist_table_if_not_exists()
+        now_tag = datetime.now().strftime('%Y%m%d%H%M%S')
+        waitlist_ids = []
+
+        with get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                with cursor.copy("""
+                    COPY waitlist (
+                        waitlist_id, guest_email, guest_name, requested_date,
+                        preferred_time, time_flexibility, players, golf_course,
+                        notes, club, priority
+                    ) FROM STDIN
+                """) as copy:
+                    for entry in entries:
+                        # Random suffix instead of the batch index: two
+                        # imports in the same second must not collide on
+                        # the UNIQUE waitlist_id column
+                        waitlist_id = f"WL-{now_tag}-{os.urandom(4).hex()}"
+                        waitlist_ids.append(waitlist_id)
+                        copy.write_row((
+                            waitlist_id,
+                            entry['guest_email'],
+                            entry.get('guest_name'),
+                            entry['requested_date'],
+                            entry.get('preferred_time'),
+                            entry.get('time_flexibility', 'Flexible'),
+                            entry.get('players', 1),
+                            entry.get('golf_course'),
+                            entry.get('notes'),
+                            entry['club'],
+                            entry.get('priority', 5),
+                        ))
+
+        load_waitlist_from_db.clear()
+        return True, waitlist_ids
+    except Exception as e:
+        st.error(f"Error bulk-adding to waitlist: {e}")
+        return False, []
+
+
 def update_waitlist_status(waitlist_id, new_status, send_notification=False):
     """Update waitlist entry status"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        if send_notification:
-            cursor.execute("""
-                UPDATE waitlist
-                SET status = %s, notification_sent = TRUE,
-                    notification_sent_at = NOW(), updated_at = NOW()
-                WHERE waitlist_id = %s
-            """, (new_status, waitlist_id))
-        else:
-            cursor.execute("""
-                UPDATE waitlist
-                SET status = %s, updated_at = NOW()
-                WHERE waitlist_id = %s
-            """, (new_status, waitlist_id))
+        with get_pool().connection() as conn:
+            if send_notification:
+                conn.execute("""
+                    UPDATE waitlist
+                    SET status = %s, notification_sent = TRUE,
+                        notification_sent_at = NOW(), updated_at = NOW()
+                    WHERE waitlist_id = %s
+                """, (new_status, waitlist_id), prepare=True)
+            else:
+                conn.execute("""
+                    UPDATE waitlist
+                    SET status = %s, updated_at = NOW()
+                    WHERE waitlist_id = %s
+                """, (new_status, waitlist_id), prepare=True)
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        load_waitlist_from_db.clear()
         return True
     except Exception as e:
         st.error(f"Error updating waitlist: {e}")
@@ -1976,14 +2278,11 @@ def update_waitlist_status(waitlist_id, new_status, send_notification=False):
 def delete_waitlist_entry(waitlist_id):
     """Delete a waitlist entry"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM waitlist WHERE waitlist_id = %s", (waitlist_id,))
+        with get_pool().connection() as conn:
+            conn.execute("DELETE FROM waitlist WHERE waitlist_id = %s", (waitlist_id,),
+                         prepare=True)
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+        load_waitlist_from_db.clear()
         return True
     except Exception as e:
         st.error(f"Error deleting waitlist entry: {e}")
@@ -1991,155 +2290,326 @@ def delete_waitlist_entry(waitlist_id):
 
 
 def get_waitlist_matches(club_filter, available_date, available_time=None):
-    """Find waitlist entries that match an available tee time"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(row_factory=dict_row)
-
-        query = """
-            SELECT * FROM waitlist
-            WHERE club = %s
-            AND requested_date = %s
-            AND status = 'Waiting'
-            ORDER BY priority DESC, created_at ASC
-        """
-        cursor.execute(query, (club_filter, available_date))
+    """Find waitlist entries that match an available tee time.
 
-        matches = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        return pd.DataFrame(matches) if matches else pd.DataFrame()
+    Returns a list of dicts ordered by priority - callers just iterate the
+    handful of matches, so skipping the DataFrame wrap avoids its fixed
+    construction overhead.
+    """
+    try:
+        with get_pool().connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cursor:
+                cursor.execute(f"""
+                    SELECT {_WAITLIST_COLS} FROM waitlist
+                    WHERE club = %s
+                    AND requested_date = %s
+                    AND status = 'Waiting'
+                    ORDER BY priority DESC, created_at ASC
+                """, (club_filter, available_date))
+
+                matches = cursor.fetchall()
+
+        return matches or []
     except Exception as e:
         st.error(f"Error finding waitlist matches: {e}")
-        return pd.DataFrame()
+        return []
 
 
 def convert_waitlist_to_booking(waitlist_entry, tee_time, total_amount=0):
     """Convert a waitlist entry to a booking"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         # Generate booking ID
         booking_id = f"BOOK-{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-        cursor.execute("""
-            INSERT INTO bookings (
-                booking_id, guest_email, date, tee_time, players, total,
-                status, note, club, timestamp, golf_courses
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), %s)
-        """, (
-            booking_id,
-            waitlist_entry['guest_email'],
-            waitlist_entry['requested_date'],
-            tee_time,
-            waitlist_entry['players'],
-            total_amount,
-            'Confirmed',
-            f"Converted from waitlist: {waitlist_entry['waitlist_id']}. {waitlist_entry.get('notes', '')}",
-            waitlist_entry['club'],
-            waitlist_entry.get('golf_course', '')
-        ))
-
-        # Update waitlist status
-        cursor.execute("""
-            UPDATE waitlist
-            SET status = 'Converted', updated_at = NOW()
-            WHERE waitlist_id = %s
-        """, (waitlist_entry['waitlist_id'],))
-
-        conn.commit()
-        cursor.close()
-        conn.close()
+        # Single CTE statement: the INSERT and the waitlist UPDATE go out
+        # in one round trip and stay atomic without an explicit transaction
+        with get_pool().connection() as conn:
+            conn.execute("""
+                WITH ins AS (
+                    INSERT INTO bookings (
+                        booking_id, guest_email, date, tee_time, players, total,
+                        status, note, club, timestamp, golf_courses
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), %s)
+                    RETURNING booking_id
+                )
+                UPDATE waitlist
+                SET status = 'Converted', updated_at = NOW()
+                WHERE waitlist_id = %s
+            """, (
+                booking_id,
+                waitlist_entry['guest_email'],
+                waitlist_entry['requested_date'],
+                tee_time,
+                waitlist_entry['players'],
+                total_amount,
+                'Confirmed',
+                f"Converted from waitlist: {waitlist_entry['waitlist_id']}. {waitlist_entry.get('notes', '')}",
+                waitlist_entry['club'],
+                waitlist_entry.get('golf_course', ''),
+                waitlist_entry['waitlist_id'],
+            ))
+
+        load_waitlist_from_db.clear()
+        load_bookings_from_db.clear()
         return True, booking_id
     except Exception as e:
         st.error(f"Error converting waitlist to booking: {e}")
         return False, None
 
 
-# ========================================
-# INBOUND EMAILS FUNCTIONS
-# ========================================
-def load_emails_by_booking_id(booking_id, guest_email=None):
-    """Load inbound emails for a specific booking
+def convert_waitlist_to_bookings_bulk(conversions):
+    """Convert several waitlist entries to bookings in one transaction.
 
-    Matches emails by:
-    1. booking_id field (if populated)
-    2. from_email matching guest_email (for emails not yet linked)
+    Takes a list of (waitlist_entry, tee_time, total_amount) tuples and
+    issues a single batched INSERT plus one UPDATE for all converted
+    entries instead of two round trips per entry.
     """
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(row_factory=dict_row)
-
-        # Query emails that either have the booking_id OR match the guest email
-        if guest_email:
-            cursor.execute("""
-                SELECT * FROM inbound_emails
-                WHERE booking_id = %s
-                   OR (booking_id IS NULL AND from_email ILIKE %s)
-                   OR (booking_id IS NULL AND to_email ILIKE %s)
-                ORDER BY received_at DESC
-            """, (booking_id, f"%{guest_email}%", f"%{guest_email}%"))
-        else:
-            cursor.execute("""
-                SELECT * FROM inbound_emails
-                WHERE booking_id = %s
-                ORDER BY received_at DESC
-            """, (booking_id,))
+    if not conversions:
+        return True, []
 
-        emails = cursor.fetchall()
-        cursor.close()
-        conn.close()
+    try:
+        now_tag = datetime.now().strftime('%Y%m%d%H%M%S')
+        rows = []
+        booking_ids = []
+        waitlist_ids = []
+
+        for i, (entry, tee_time, total_amount) in enumerate(conversions):
+            booking_id = f"BOOK-{now_tag}-{i:03d}"
+            booking_ids.append(booking_id)
+            waitlist_ids.append(entry['waitlist_id'])
+            rows.append((
+                booking_id,
+                entry['guest_email'],
+                entry['requested_date'],
+                tee_time,
+                entry['players'],
+                total_amount,
+                'Confirmed',
+                f"Converted from waitlist: {entry['waitlist_id']}. {entry.get('notes', '')}",
+                entry['club'],
+                entry.get('golf_course', '')
+            ))
+
+        with get_pool().connection() as conn:
+            with conn.transaction():
+                with conn.cursor() as cursor:
+                    cursor.executemany("""
+                        INSERT INTO bookings (
+                            booking_id, guest_email, date, tee_time, players, total,
+                            status, note, club, timestamp, golf_courses
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), %s)
+                    """, rows)
+
+                    cursor.execute("""
+                        UPDATE waitlist
+                        SET status = 'Converted', updated_at = NOW()
+                        WHERE waitlist_id = ANY(%s)
+                    """, (waitlist_ids,))
+
+        load_waitlist_from_db.clear()
+        load_bookings_from_db.clear()
+        return True, booking_ids
+    except Exception as e:
+        st.error(f"Error converting waitlist entries: {e}")
+        return False, []
 
-        if not emails:
-            return []
 
-        # Convert to list of dicts and format dates
-        result = []
-        for email in emails:
-            email_dict = dict(email)
-            # Convert timestamp columns to formatted strings
-            if 'received_at' in email_dict and email_dict['received_at']:
-                email_dict['received_at_formatted'] = email_dict['received_at'].strftime('%b %d, %Y %I:%M %p')
-            else:
-                email_dict['received_at_formatted'] = 'N/A'
-            result.append(email_dict)
+# ========================================
+# INBOUND EMAILS FUNCTIONS
+# ========================================
+@st.cache_data(ttl=60, show_spinner=False)
+def load_emails_for_bookings(booking_ids, guest_emails):
+    """Load inbound emails for a whole page of bookings in one query.
+
+    booking_ids and guest_emails are parallel tuples; unlinked emails are
+    matched back to a booking through the guest address. Returns
+    {booking_id: [email dicts]} so each card does an O(1) lookup instead
+    of its own round trip.
+    """
+    if not booking_ids:
+        return {}
 
-        return result
+    try:
+        id_list = list(booking_ids)
+        by_guest = {str(e).lower(): b for b, e in zip(booking_ids, guest_emails) if e}
+        lowered = list(by_guest.keys())
+
+        with get_pool().connection() as conn:
+            with conn.cursor(row_factory=dict_row) as cursor:
+                cursor.execute(f"""
+                    SELECT {_INBOUND_EMAIL_COLS} FROM inbound_emails
+                    WHERE booking_id = ANY(%s)
+                       OR (booking_id IS NULL AND (lower(from_email) = ANY(%s)
+                                                   OR lower(to_email) = ANY(%s)))
+                    ORDER BY received_at DESC
+                """, (id_list, lowered, lowered))
+
+                emails_map = {}
+                known_ids = set(id_list)
+                for email in cursor:
+                    received_at = email.get('received_at')
+                    email['received_at_formatted'] = (
+                        received_at.strftime('%b %d, %Y %I:%M %p') if received_at else 'N/A')
+                    target = email.get('booking_id')
+                    if target not in known_ids:
+                        target = (by_guest.get(str(email.get('from_email', '')).lower())
+                                  or by_guest.get(str(email.get('to_email', '')).lower()))
+                    if target is not None:
+                        emails_map.setdefault(target, []).append(email)
+
+        return emails_map
     except Exception as e:
         st.error(f"Error loading emails: {e}")
-        return []
+        return {}
 
 
 # ========================================
 # ANALYTICS HELPER FUNCTIONS
 # ========================================
+def _frame_cache_key(df):
+    """Cheap cache key for booking frames: full-frame hashing is slow,
+    but (row count, newest creation, newest update) changes whenever
+    rows are added or edited - every mutator bumps updated_at, so
+    in-place changes invalidate dependent caches too."""
+    ts_max = str(df['timestamp'].max()) if 'timestamp' in df.columns else ''
+    upd_max = str(df['updated_at'].max()) if 'updated_at' in df.columns else ''
+    return (len(df), ts_max, upd_max)
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def build_search_index(df):
+    """Pre-lowered search blob over the searchable booking columns.
+
+    One cached concatenated column means a search keystroke costs a single
+    str.contains pass instead of five lowercase+contains passes per rerun.
+    """
+    # guest_email/guest_name/booking_id/note are Arrow-backed strings, so
+    # no astype(str) round-trip through Python objects is needed
+    return (
+        df['guest_email'].fillna('')
+        .str.cat([
+            df['guest_name'].fillna(''),
+            df['booking_id'],
+            df.get('golf_courses', pd.Series('', index=df.index)).astype(str),
+            df['note'].fillna(''),
+        ], sep='\x1f')
+        .str.lower()
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _excel_bytes(df):
+    """Serialize a frame to .xlsx once per distinct frame.
+
+    xlsxwriter serializes faster and lighter than openpyxl; caching on
+    the full frame hash means repeat exports of unchanged data return
+    the same bytes without re-serializing. Note: no constant_memory
+    mode - pandas writes cells column-major, and constant_memory
+    silently drops writes to already-flushed rows, corrupting every
+    column after the first.
+    """
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Bookings')
+    return output.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(df):
+    """Serialize a frame to CSV bytes once per distinct frame.
+
+    Encoding here also spares Streamlit the str-to-bytes copy it would
+    otherwise make inside st.download_button.
+    """
+    return df.to_csv(index=False).encode('utf-8')
+
+
+# cache_resource so the sliced frame is shared by reference instead of
+# pickled per hit; nothing downstream mutates it
+@st.cache_resource(ttl=300, show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def _analysis_slice(df, start_ts, end_ts):
+    """Period filter plus headline metrics in one pass.
+
+    Returns (sliced frame, (bookings, revenue, avg value, players)) so a
+    rerun with an unchanged period does neither the boolean-mask scan
+    nor the four column reductions.
+    """
+    sliced = df[(df['timestamp'] >= start_ts) & (df['timestamp'] <= end_ts)]
+    n = len(sliced)
+    total_revenue = float(sliced['total'].sum())
+    metrics = (n, total_revenue,
+               total_revenue / n if n else 0.0,
+               int(sliced['players'].sum()))
+    return sliced, metrics
+
+
+@st.cache_data(ttl=300, show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def _status_summary(df):
+    """Status counts and revenue-by-status for the analytics page."""
+    # One grouped pass yields both the counts and the revenue sums
+    grouped = df.groupby('status', observed=True)['total'].agg(['size', 'sum'])
+    status_counts = grouped['size'].sort_values(ascending=False)
+    revenue_by_status = grouped['sum'].sort_values(ascending=False)
+    return status_counts, revenue_by_status
+
+
+@st.cache_data(ttl=300, show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def _daily_bookings(df):
+    """Per-day booking counts, revenue and player totals."""
+    daily = df.groupby(df['timestamp'].dt.date).agg({
+        'booking_id': 'count',
+        'total': 'sum',
+        'players': 'sum'
+    }).reset_index()
+    daily.columns = ['Date', 'Bookings', 'Revenue', 'Players']
+    return daily
+
+
+@st.cache_data(ttl=300, show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def _tee_time_popularity(df):
+    """Top tee times by booking count."""
+    # value_counts drops NaN and sorts descending in a single hash pass,
+    # with no intermediate filtered frame
+    return df['tee_time'].value_counts().head(10)
+
+
+@st.cache_data(ttl=300, show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
+def _day_popularity(df):
+    """Bookings per weekday in calendar order."""
+    # date is already datetime64 from the loader; no to_datetime re-parse
+    return (df['date'].dt.day_name().value_counts()
+            .reindex(['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                      'Friday', 'Saturday', 'Sunday'], fill_value=0))
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
 def calculate_lead_times(df):
     """Calculate average lead time between inquiry and booking"""
-    lead_times = []
-
-    # Calculate lead time as days between booking creation and tee date
-    for _, row in df.iterrows():
-        if pd.notna(row.get('timestamp')) and pd.notna(row.get('date')):
-            lead_time = (row['date'] - row['timestamp']).days
-            if lead_time >= 0:  # Only positive lead times
-                lead_times.append({
-                    'booking_id': row['booking_id'],
-                    'lead_time_days': lead_time,
-                    'status': row['status']
-                })
+    if df.empty:
+        return pd.DataFrame()
 
-    return pd.DataFrame(lead_times)
+    # Lead time as days between booking creation and tee date, computed
+    # as one vectorized subtraction; keep only valid, non-negative rows
+    lead_days = (df['date'] - df['timestamp']).dt.days
+    mask = df['date'].notna() & df['timestamp'].notna() & lead_days.ge(0)
+
+    return pd.DataFrame({
+        'booking_id': df.loc[mask, 'booking_id'],
+        'lead_time_days': lead_days[mask],
+        'status': df.loc[mask, 'status'],
+    })
 
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
 def calculate_customer_inquiry_frequency(df):
     """Calculate booking inquiry frequency by customer for targeted marketing"""
-    customer_stats = df.groupby('guest_email').agg({
+    customer_stats = df.assign(
+        _is_booked=(df['status'] == 'Booked')
+    ).groupby('guest_email').agg({
         'booking_id': 'count',
         'total': 'sum',
         'players': 'sum',
-        'status': lambda x: (x == 'Booked').sum()
+        '_is_booked': 'sum'
     }).reset_index()
 
     customer_stats.columns = ['Customer Email', 'Total Inquiries', 'Total Revenue',
@@ -2158,6 +2628,7 @@ def calculate_customer_inquiry_frequency(df):
     return customer_stats.sort_values('Total Inquiries', ascending=False)
 
 
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: _frame_cache_key})
 def calculate_golf_course_popularity(df):
     """Calculate booking statistics by golf course"""
     # Filter rows with golf course data
@@ -2166,11 +2637,13 @@ def calculate_golf_course_popularity(df):
     if course_df.empty:
         return pd.DataFrame()
 
-    course_stats = course_df.groupby('golf_courses').agg({
+    course_stats = course_df.assign(
+        _is_booked=(course_df['status'] == 'Booked')
+    ).groupby('golf_courses', observed=True).agg({
         'booking_id': 'count',
         'total': 'sum',
         'players': 'sum',
-        'status': lambda x: (x == 'Booked').sum()
+        '_is_booked': 'sum'
     }).reset_index()
 
     course_stats.columns = ['Golf Course', 'Total Requests', 'Total Revenue',
@@ -2187,102 +2660,124 @@ def calculate_golf_course_popularity(df):
     return course_stats.sort_values('Total Requests', ascending=False)
 
 
-def identify_marketing_segments(df):
+@st.cache_data(ttl=60, show_spinner=False)
+def load_customer_stats_from_db(club_filter):
+    """Aggregate per-customer booking stats in Postgres.
+
+    The GROUP BY runs server-side so only one row per customer crosses
+    the wire, instead of shipping every booking into a pandas groupby.
+    """
+    try:
+        with get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT guest_email,
+                           COUNT(*) AS total_contacts,
+                           COALESCE(SUM(total), 0)::float AS total_revenue,
+                           SUM((status = 'Booked')::int) AS completed_bookings,
+                           MAX(timestamp) AS last_contact
+                    FROM bookings
+                    WHERE club = %s
+                    GROUP BY guest_email
+                """, (club_filter,))
+                rows = cursor.fetchall()
+
+        return pd.DataFrame.from_records(
+            rows, columns=['Customer Email', 'Total Contacts', 'Total Revenue',
+                           'Completed Bookings', 'Last Contact'])
+    except Exception as e:
+        st.error(f"Error loading customer stats: {e}")
+        return pd.DataFrame()
+
+
+def identify_marketing_segments(club_filter):
     """
     Identify marketing segments including frequent non-booking leads.
     Returns segmented customer data for targeted campaigns.
     """
-    customer_stats = df.groupby('guest_email').agg({
-        'booking_id': 'count',
-        'total': 'sum',
-        'status': lambda x: list(x),
-        'timestamp': 'max'
-    }).reset_index()
-
-    customer_stats.columns = ['Customer Email', 'Total Contacts', 'Total Revenue',
-                              'Statuses', 'Last Contact']
-
-    # Calculate completed bookings
-    customer_stats['Completed Bookings'] = customer_stats['Statuses'].apply(
-        lambda x: sum(1 for s in x if s == 'Booked')
-    )
-
-    # Define segments
-    segments = []
-    for _, row in customer_stats.iterrows():
-        total_contacts = row['Total Contacts']
-        completed = row['Completed Bookings']
-        revenue = row['Total Revenue']
-
-        if total_contacts >= 3 and completed == 0:
-            segment = 'Frequent Non-Booker'
-            priority = 'High'
-            action = 'Targeted re-engagement campaign'
-        elif total_contacts >= 2 and completed == 0:
-            segment = 'Repeat Inquirer'
-            priority = 'Medium'
-            action = 'Follow-up offer campaign'
-        elif completed > 0 and revenue > 500:
-            segment = 'High-Value Customer'
-            priority = 'VIP'
-            action = 'Loyalty rewards program'
-        elif completed > 0:
-            segment = 'Converted Customer'
-            priority = 'Standard'
-            action = 'Retention campaign'
-        else:
-            segment = 'Single Inquiry'
-            priority = 'Low'
-            action = 'General marketing list'
-
-        segments.append({
-            'Customer Email': row['Customer Email'],
-            'Total Contacts': total_contacts,
-            'Completed Bookings': completed,
-            'Total Revenue': revenue,
-            'Last Contact': row['Last Contact'],
-            'Segment': segment,
-            'Priority': priority,
-            'Recommended Action': action
-        })
-
-    return pd.DataFrame(segments)
+    customer_stats = load_customer_stats_from_db(club_filter)
+    if customer_stats.empty:
+        return customer_stats
+
+    # Assign segment/priority/action with np.select over boolean masks
+    # instead of a per-row if/elif cascade
+    tc = customer_stats['Total Contacts']
+    cb = customer_stats['Completed Bookings']
+    rv = customer_stats['Total Revenue']
+    conds = [
+        (tc >= 3) & (cb == 0),
+        (tc >= 2) & (cb == 0),
+        (cb > 0) & (rv > 500),
+        cb > 0,
+    ]
+    customer_stats['Segment'] = np.select(
+        conds,
+        ['Frequent Non-Booker', 'Repeat Inquirer', 'High-Value Customer', 'Converted Customer'],
+        'Single Inquiry')
+    customer_stats['Priority'] = np.select(
+        conds, ['High', 'Medium', 'VIP', 'Standard'], 'Low')
+    customer_stats['Recommended Action'] = np.select(
+        conds,
+        ['Targeted re-engagement campaign', 'Follow-up offer campaign',
+         'Loyalty rewards program', 'Retention campaign'],
+        'General marketing list')
+
+    return customer_stats[['Customer Email', 'Total Contacts', 'Completed Bookings',
+                           'Total Revenue', 'Last Contact', 'Segment', 'Priority',
+                           'Recommended Action']]
 
 
 # ========================================
 # MAIN DASHBOARD
 # ========================================
 
+# Date presets resolved via a single dict lookup instead of an elif
+# cascade on every rerun. "All" presets map to None (no date filter).
+_DATE_PRESETS = {
+    "All Bookings": lambda t: None,
+    "Past 30 Days": lambda t: (t - timedelta(days=30), t),
+    "Past 7 Days": lambda t: (t - timedelta(days=7), t),
+    "Today": lambda t: (t, t),
+    "Next 7 Days": lambda t: (t, t + timedelta(days=7)),
+    "Next 30 Days": lambda t: (t, t + timedelta(days=30)),
+    "Next 60 Days": lambda t: (t, t + timedelta(days=60)),
+    "Next 90 Days": lambda t: (t, t + timedelta(days=90)),
+    "All Upcoming": lambda t: None,
+}
+_ALL_STATUS_SET = frozenset(
+    ["Inquiry", "Requested", "Confirmed", "Booked", "Rejected", "Cancelled", "Pending"])
+_ACTIVE_STATUS_SET = frozenset(
+    ["Inquiry", "Requested", "Confirmed", "Booked", "Pending"])
+
+# Constant sidebar HTML built once at import instead of per rerun
+_SIDEBAR_LOGO_HTML = """
+    <div style='display: flex; justify-content: center; align-items: center; padding: 1rem 0.5rem; margin-bottom: 1rem;'>
+        <img src='https://raw.githubusercontent.com/jimbobirecode/TeeMail-Assests/main/output-onlinepngtools.png' width='180' style='display: block;'/>
+    </div>
+    <div style='text-align: center; margin-top: 0.5rem;'>
+        <p style='color: #f9fafb; font-size: 0.9rem; margin: 0; font-weight: 600; letter-spacing: 0.5px;'>Booking Dashboard</p>
+    </div>
+"""
+_SIDEBAR_DIVIDER_HTML = "<div style='height: 1px; background: #3b82f6; margin: 1.5rem 0;'></div>"
+
 with st.sidebar:
     # TeeMail Demo logo
-    st.markdown("""
-        <div style='display: flex; justify-content: center; align-items: center; padding: 1rem 0.5rem; margin-bottom: 1rem;'>
-            <img src='https://raw.githubusercontent.com/jimbobirecode/TeeMail-Assests/main/output-onlinepngtools.png' width='180' style='display: block;'/>
-        </div>
-    """, unsafe_allow_html=True)
-    st.markdown("""
-        <div style='text-align: center; margin-top: 0.5rem;'>
-            <p style='color: #f9fafb; font-size: 0.9rem; margin: 0; font-weight: 600; letter-spacing: 0.5px;'>Booking Dashboard</p>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_SIDEBAR_LOGO_HTML, unsafe_allow_html=True)
 
     st.markdown("<div style='height: 1px; background: #3b82f6; margin: 1rem 0 1.5rem 0;'></div>", unsafe_allow_html=True)
 
     st.markdown(f"<div class='user-badge'>{st.session_state.full_name}</div>", unsafe_allow_html=True)
 
-    # Get club display name - always show TeeMail Demo
-    club_display = get_club_display_name(st.session_state.customer_id) if st.session_state.customer_id else 'TeeMail Demo'
-    # Force TeeMail Demo display
-    club_display = 'TeeMail Demo'
-    st.markdown(f"<div class='club-badge'>{club_display}</div>", unsafe_allow_html=True)
+    # Always show TeeMail Demo - no lookup needed for a fixed label
+    st.markdown("<div class='club-badge'>TeeMail Demo</div>", unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 1px; background: #3b82f6; margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_SIDEBAR_DIVIDER_HTML, unsafe_allow_html=True)
 
     if st.button("Logout", use_container_width=True):
         logout()
         st.rerun()
 
-    st.markdown("<div style='height: 1px; background: #3b82f6; margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_SIDEBAR_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Navigation menu
     st.markdown("#### Navigation")
@@ -2305,7 +2800,7 @@ with st.sidebar:
         st.session_state.current_page = page
         st.rerun()
 
-    st.markdown("<div style='height: 1px; background: #3b82f6; margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_SIDEBAR_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Only show filters for Bookings page
     if page == "Bookings":
@@ -2327,24 +2822,8 @@ with st.sidebar:
         )
 
         # Calculate date range based on preset
-        if date_preset == "All Bookings":
-            date_range = None  # Show all bookings including those with NULL dates
-        elif date_preset == "Past 30 Days":
-            date_range = (datetime.now().date() - timedelta(days=30), datetime.now().date())
-        elif date_preset == "Past 7 Days":
-            date_range = (datetime.now().date() - timedelta(days=7), datetime.now().date())
-        elif date_preset == "Today":
-            date_range = (datetime.now().date(), datetime.now().date())
-        elif date_preset == "Next 7 Days":
-            date_range = (datetime.now().date(), datetime.now().date() + timedelta(days=7))
-        elif date_preset == "Next 30 Days":
-            date_range = (datetime.now().date(), datetime.now().date() + timedelta(days=30))
-        elif date_preset == "Next 60 Days":
-            date_range = (datetime.now().date(), datetime.now().date() + timedelta(days=60))
-        elif date_preset == "Next 90 Days":
-            date_range = (datetime.now().date(), datetime.now().date() + timedelta(days=90))
-        elif date_preset == "All Upcoming":
-            date_range = None  # Show all upcoming bookings including those with NULL dates
+        if date_preset in _DATE_PRESETS:
+            date_range = _DATE_PRESETS[date_preset](datetime.now().date())
         else:  # Custom
             date_range = st.date_input(
                 "Custom Date Range",
@@ -2358,14 +2837,12 @@ with st.sidebar:
             else:
                 default_statuses = [st.session_state.clicked_status_filter]
         else:
-            # For "All Bookings" and "All Upcoming", include all statuses by default
-            if date_preset in ["All Bookings", "All Upcoming"]:
-                default_statuses = ["Inquiry", "Requested", "Confirmed", "Booked", "Rejected", "Cancelled", "Pending"]
+            # For "All Bookings" and "All Upcoming", include all statuses by default;
+            # other presets show only active statuses. Merge with auto-included ones.
+            if date_preset in ("All Bookings", "All Upcoming"):
+                default_statuses = list(_ALL_STATUS_SET | st.session_state.auto_include_status)
             else:
-                # For other presets, show only active statuses by default
-                default_statuses = ["Inquiry", "Requested", "Confirmed", "Booked", "Pending"]
-            # Merge with auto-included ones
-            default_statuses = list(set(default_statuses) | st.session_state.auto_include_status)
+                default_statuses = list(_ACTIVE_STATUS_SET | st.session_state.auto_include_status)
 
         status_filter = st.multiselect(
             "Status",
@@ -2383,7 +2860,10 @@ with st.sidebar:
         # Clear filter button
         if st.button("Clear All Filters", use_container_width=True):
             st.session_state.clicked_status_filter = None
-            st.cache_data.clear()
+            # Drop the keyed radio's persisted selection too, otherwise it
+            # survives the rerun and writes the old filter straight back
+            st.session_state.pop("status_metric_radio", None)
+            load_bookings_from_db.clear()
             st.rerun()
 
 # ========================================
@@ -2403,7 +2883,7 @@ if page == "Bookings":
         """, unsafe_allow_html=True)
     with header_col2:
         if st.button("Refresh", key="refresh_bookings", use_container_width=True, help="Refresh booking data"):
-            st.cache_data.clear()
+            load_bookings_from_db.clear()
             st.rerun()
     
     # Show active filter indicator
@@ -2426,32 +2906,23 @@ if page == "Bookings":
 
     # Create a date-only filtered dataframe for counting "Showing" numbers
     # This ensures the counts reflect bookings within the date range, regardless of status filter
-    date_filtered_df = df.copy()
+    # (no copy: these frames are read-only and boolean indexing below
+    # already allocates new frames when a filter applies)
+    date_filtered_df = df
 
     # Handle date range filtering for date_filtered_df
-    # Skip date filtering if date_range is None (for "All Bookings" and "All Upcoming")
-    if date_range and date_range is not None:
-        if isinstance(date_range, tuple) and len(date_range) == 2:
-            start_date, end_date = date_range
-            # Convert date objects to datetime for comparison
-            start_datetime = pd.to_datetime(start_date)
-            end_datetime = pd.to_datetime(end_date)
-            date_filtered_df = date_filtered_df[
-                (date_filtered_df['date'] >= start_datetime) &
-                (date_filtered_df['date'] <= end_datetime)
-            ]
-        elif hasattr(date_range, '__len__') and len(date_range) == 2:
-            start_date, end_date = date_range[0], date_range[1]
-            # Convert date objects to datetime for comparison
-            start_datetime = pd.to_datetime(start_date)
-            end_datetime = pd.to_datetime(end_date)
-            date_filtered_df = date_filtered_df[
-                (date_filtered_df['date'] >= start_datetime) &
-                (date_filtered_df['date'] <= end_datetime)
-            ]
+    # Skip date filtering if date_range is None (for "All Bookings" and "All Upcoming");
+    # both the preset tuple and st.date_input's return are 2-element sequences,
+    # so one branch covers them. datetime64 bounds compare against the raw
+    # ndarray without per-row Timestamp boxing.
+    if date_range is not None and hasattr(date_range, '__len__') and len(date_range) == 2:
+        start_dt = np.datetime64(pd.Timestamp(date_range[0]))
+        end_dt = np.datetime64(pd.Timestamp(date_range[1]))
+        dates = date_filtered_df['date'].values
+        date_filtered_df = date_filtered_df[(dates >= start_dt) & (dates <= end_dt)]
 
     # Create the fully filtered dataframe (by both status and date) for displaying bookings
-    filtered_df = date_filtered_df.copy()
+    filtered_df = date_filtered_df
     if status_filter:
         filtered_df = filtered_df[filtered_df['status'].isin(status_filter)]
 
@@ -2459,47 +2930,45 @@ if page == "Bookings":
     if show_small_groups_only:
         filtered_df = filtered_df[filtered_df['players'] <= 2]
 
-    col1, col2, col3, col4 = st.columns(4)
-
-    # Calculate counts for all statuses (before any filtering)
-    all_inquiry_count = len(df[df['status'].isin(['Inquiry', 'Pending'])])
-    all_requested_count = len(df[df['status'] == 'Requested'])
-    all_confirmed_count = len(df[df['status'] == 'Confirmed'])
-    all_booked_count = len(df[df['status'] == 'Booked'])
-
-    with col1:
-        inquiry_count = len(date_filtered_df[date_filtered_df['status'].isin(['Inquiry', 'Pending'])])
-        if st.button(f"Inquiry\n{all_inquiry_count}", key="filter_inquiry", use_container_width=True, help="Click to filter Inquiry status"):
-            st.session_state.clicked_status_filter = "Inquiry+Pending"
-            st.cache_data.clear()
-            st.rerun()
-        st.markdown(f"<div style='text-align: center; color: #ffffff; font-size: 0.75rem; margin-top: -0.5rem;'>Showing: {inquiry_count}</div>", unsafe_allow_html=True)
-
-    with col2:
-        requested_count = len(date_filtered_df[date_filtered_df['status'] == 'Requested'])
-        if st.button(f"Requested\n{all_requested_count}", key="filter_requested", use_container_width=True, help="Click to filter Requested status"):
-            st.session_state.clicked_status_filter = "Requested"
-            st.cache_data.clear()
-            st.rerun()
-        st.markdown(f"<div style='text-align: center; color: #ffffff; font-size: 0.75rem; margin-top: -0.5rem;'>Showing: {requested_count}</div>", unsafe_allow_html=True)
-
-    with col3:
-        confirmed_count = len(date_filtered_df[date_filtered_df['status'] == 'Confirmed'])
-        if st.button(f"Confirmed\n{all_confirmed_count}", key="filter_confirmed", use_container_width=True, help="Click to filter Confirmed status"):
-            st.session_state.clicked_status_filter = "Confirmed"
-            st.cache_data.clear()
-            st.rerun()
-        st.markdown(f"<div style='text-align: center; color: #ffffff; font-size: 0.75rem; margin-top: -0.5rem;'>Showing: {confirmed_count}</div>", unsafe_allow_html=True)
-
-    with col4:
-        booked_count = len(date_filtered_df[date_filtered_df['status'] == 'Booked'])
-        if st.button(f"Booked\n{all_booked_count}", key="filter_booked", use_container_width=True, help="Click to filter Booked status"):
-            st.session_state.clicked_status_filter = "Booked"
-            st.cache_data.clear()
-            st.rerun()
-        st.markdown(f"<div style='text-align: center; color: #ffffff; font-size: 0.75rem; margin-top: -0.5rem;'>Showing: {booked_count}</div>", unsafe_allow_html=True)
+    # One hashed pass per frame instead of a boolean mask per status
+    all_counts = df['status'].value_counts()
+    date_counts = date_filtered_df['status'].value_counts()
+    all_inquiry_count = int(all_counts.get('Inquiry', 0) + all_counts.get('Pending', 0))
+    all_requested_count = int(all_counts.get('Requested', 0))
+    all_confirmed_count = int(all_counts.get('Confirmed', 0))
+    all_booked_count = int(all_counts.get('Booked', 0))
+    inquiry_count = int(date_counts.get('Inquiry', 0) + date_counts.get('Pending', 0))
+    requested_count = int(date_counts.get('Requested', 0))
+    confirmed_count = int(date_counts.get('Confirmed', 0))
+    booked_count = int(date_counts.get('Booked', 0))
+
+    # One horizontal radio replaces the four filter buttons: a single
+    # widget to reconcile per rerun, and filtering is a pure pandas mask
+    # so no cache invalidation is needed
+    _metric_labels = {
+        None: "All",
+        "Inquiry+Pending": f"Inquiry {all_inquiry_count} · showing {inquiry_count}",
+        "Requested": f"Requested {all_requested_count} · showing {requested_count}",
+        "Confirmed": f"Confirmed {all_confirmed_count} · showing {confirmed_count}",
+        "Booked": f"Booked {all_booked_count} · showing {booked_count}",
+    }
+    _metric_options = list(_metric_labels)
+    _current_metric = st.session_state.clicked_status_filter
+    metric_choice = st.radio(
+        "Filter by status",
+        _metric_options,
+        index=_metric_options.index(_current_metric) if _current_metric in _metric_options else 0,
+        format_func=_metric_labels.get,
+        horizontal=True,
+        key="status_metric_radio",
+        label_visibility="collapsed"
+    )
+    # Mirror the nav radio: update state and rerun only on an actual change
+    if metric_choice != _current_metric:
+        st.session_state.clicked_status_filter = metric_choice
+        st.rerun()
     
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
     
     # Format date range string
     if date_range:
@@ -2512,22 +2981,26 @@ if page == "Bookings":
     else:
         date_str = "all dates"
     
-    # Search bar
-    search_term = st.text_input(
-        "🔍 Search bookings",
-        placeholder="Search by name, email, booking ID, golf course...",
-        key="booking_search"
-    )
+    # Search bar inside a form: typing no longer reruns the whole page
+    # per keystroke, only submitting does
+    with st.form("booking_search_form", border=False):
+        search_col, search_btn_col = st.columns([5, 1])
+        with search_col:
+            search_term = st.text_input(
+                "🔍 Search bookings",
+                placeholder="Search by name, email, booking ID, golf course...",
+                key="booking_search"
+            )
+        with search_btn_col:
+            st.form_submit_button("Search", use_container_width=True)
 
-    # Apply search filter
+    # Apply search filter against the cached pre-lowered blob; one
+    # substring pass replaces five per-column lowercase+contains scans
     if search_term:
         search_lower = search_term.lower()
+        search_index = build_search_index(df)
         filtered_df = filtered_df[
-            filtered_df['guest_email'].astype(str).str.lower().str.contains(search_lower, na=False) |
-            filtered_df['guest_name'].astype(str).str.lower().str.contains(search_lower, na=False) |
-            filtered_df['booking_id'].astype(str).str.lower().str.contains(search_lower, na=False) |
-            filtered_df.get('golf_courses', pd.Series(dtype=str)).astype(str).str.lower().str.contains(search_lower, na=False) |
-            filtered_df.get('note', pd.Series(dtype=str)).astype(str).str.lower().str.contains(search_lower, na=False)
+            search_index.loc[filtered_df.index].str.contains(search_lower, regex=False, na=False)
         ]
 
     st.markdown(f"""
@@ -2540,145 +3013,176 @@ if page == "Bookings":
     # Add visual separator
     st.markdown("<div style='margin-bottom: 1rem;'></div>", unsafe_allow_html=True)
 
+    # Paginate the cards: each card emits several widgets plus a DB call,
+    # so rendering is capped per page instead of growing with the table
+    total_pages = max(1, (len(filtered_df) + _PAGE_SIZE - 1) // _PAGE_SIZE)
+    page_num = st.number_input("Page", min_value=1, max_value=total_pages, value=1,
+                               key="booking_page")
+    st.caption(f"Page {page_num} of {total_pages}")
+    page_df = filtered_df.iloc[(page_num - 1) * _PAGE_SIZE: page_num * _PAGE_SIZE]
+
+    # One batched email query, and only for cards where the user has
+    # actually asked for emails - unopened cards cost nothing
+    _open_email_cards = [
+        (bid, email) for bid, email in zip(page_df['booking_id'], page_df['guest_email'])
+        if st.session_state.get(f"show_emails_{bid}")
+    ]
+    emails_map = load_emails_for_bookings(
+        tuple(bid for bid, _ in _open_email_cards),
+        tuple(email for _, email in _open_email_cards))
+
+    # With no Stripe key the payment sub-tree is skipped wholesale below;
+    # warn once here instead of once per card
+    stripe_enabled = bool(STRIPE_SECRET_KEY)
+    if not stripe_enabled:
+        st.warning("Stripe not configured. Set STRIPE_SECRET_KEY to enable payments.")
+
+    # One batched payment-history query, and only for cards where the
+    # user has asked for history - same lazy pattern as the email loads
+    # (nested expanders are not allowed, so a checkbox gates the block)
+    payments_map = (get_payments_by_booking_ids(tuple(
+        bid for bid in page_df['booking_id']
+        if st.session_state.get(f"show_payments_{bid}")
+    )) if stripe_enabled else {})
+
+    # Pre-stringify dates for the page in four vectorized strftime passes
+    # rather than one Python-level strftime per field per card
+    page_df = page_df.assign(
+        tee_date_str=page_df['date'].dt.strftime('%b %d, %Y').fillna('Not Set'),
+        requested_str=page_df['timestamp'].dt.strftime('%b %d • %I:%M %p'),
+        hotel_in_str=page_df['hotel_checkin'].dt.strftime('%b %d, %Y').fillna('Not Set'),
+        hotel_out_str=page_df['hotel_checkout'].dt.strftime('%b %d, %Y').fillna('Not Set'),
+        updated_str=page_df['updated_at'].dt.strftime('%b %d, %Y • %I:%M %p').fillna(''),
+        # HTML-escape the user-supplied fields once per page via Series.map
+        # instead of per-row html.escape calls inside the card loop
+        booking_id_h=page_df['booking_id'].astype(str).map(html.escape),
+        guest_email_h=page_df['guest_email'].astype(str).map(html.escape),
+        courses_h=page_df['golf_courses'].astype(str).str.strip().map(html.escape),
+        times_h=page_df['selected_tee_times'].astype(str).str.strip().map(html.escape),
+        # Presence masks computed once per page; the loop just reads bools
+        has_golf=(page_df['golf_courses'].notna()
+                  & (page_df['golf_courses'].astype(str).str.strip() != '')),
+        has_times=(page_df['selected_tee_times'].notna()
+                   & (page_df['selected_tee_times'].astype(str).str.strip() != '')),
+        # Deposit amounts and payment-status lookups in one vectorized
+        # pass instead of a float multiply and two dict .gets per card
+        deposit_amount=(page_df['total'].astype('float64')
+                        * page_df['deposit_percentage'].astype('float64') / 100.0),
+        pay_color=page_df['payment_status'].astype(str).map(_PAYMENT_STATUS_COLORS).fillna('#64748b'),
+        pay_text=page_df['payment_status'].astype(str).map(_PAYMENT_STATUS_TEXT).fillna('Unknown'),
+    )
+
+    # One shared set of booking_ids awaiting delete confirmation instead
+    # of a session_state key per booking
+    confirm_delete_ids = st.session_state.setdefault('confirm_delete_ids', set())
+
+    # Identity-stable options object for the status selectboxes: reusing
+    # the session-held tuple keeps widget-option diffing trivial across
+    # reruns (the module constant is re-created each script execution)
+    all_statuses = st.session_state.setdefault('_all_statuses', _ALL_STATUSES)
+
     # ========================================
     # BOOKING CARDS - ENHANCED VERSION
     # ========================================
-    for idx, booking in filtered_df.iterrows():
-        status_icon = get_status_icon(booking['status'])
-        status_class = get_status_color(booking['status'])
-    
-        tee_time_display = booking.get('tee_time', 'Not Specified')
+    for booking in page_df.itertuples(index=False, name='Booking'):
+        tee_time_display = booking.tee_time
         if tee_time_display == 'None' or tee_time_display is None or pd.isna(tee_time_display):
             tee_time_display = 'Not Specified'
 
-        # Handle tee date display (check for NULL/NaT dates)
-        tee_date = booking.get('date')
-        if tee_date is None or pd.isna(tee_date):
-            tee_date_display = 'Not Set'
-        else:
-            tee_date_display = tee_date.strftime('%b %d, %Y')
+        # Tee date display was pre-formatted (NaT already maps to 'Not Set')
+        tee_date_display = booking.tee_date_str
 
-        note_content = booking.get('note', '')
+        note_content = booking.note
         if note_content is None or pd.isna(note_content):
             note_content = 'No additional information provided'
     
         # Prepare progress bar data
-        current_status = booking['status']
+        current_status = booking.status
         if current_status == 'Pending':
             current_status = 'Inquiry'
-    
-        stages = [
-            {'name': 'Inquiry', 'color': '#3b82f6'},
-            {'name': 'Requested', 'color': '#fbbf24'},
-            {'name': 'Confirmed', 'color': '#a78bfa'},
-            {'name': 'Booked', 'color': '#10b981'}
-        ]
-    
+
         is_rejected = current_status == 'Rejected'
         is_cancelled = current_status == 'Cancelled'
-        current_index = next((i for i, s in enumerate(stages) if s['name'] == current_status), 0)
-        progress_width = (current_index / (len(stages) - 1)) * 100 if len(stages) > 1 else 0
-    
-        # Format requested time
-        requested_time = booking['timestamp'].strftime('%b %d • %I:%M %p')
-    
+
+        # Requested time was pre-formatted with the page
+        requested_time = booking.requested_str
+
         with st.container():
-            # Build progress bar HTML inline
-            if is_rejected or is_cancelled:
-                status_color = '#ef4444' if is_rejected else '#64748b'
-                progress_html = f"<div style='background: #1e3a8a; padding: 1rem; border-radius: 8px; border: 2px solid #10b981;'><div style='display: flex; align-items: center; justify-content: center; gap: 0.75rem;'><div style='width: 12px; height: 12px; border-radius: 50%; background: {status_color};'></div><span style='color: {status_color}; font-weight: 700; font-size: 1rem; text-transform: uppercase; letter-spacing: 0.5px;'>{current_status}</span></div></div>"
-            else:
-                # Build stage nodes HTML
-                stages_html = ""
-                for i, stage in enumerate(stages):
-                    is_active = i <= current_index
-                    is_current = i == current_index
-                    bg_color = stage['color'] if is_active else '#1e40af'
-                    text_color = '#f9fafb' if is_active else '#64748b'
-                    border_color = stage['color'] if is_current else ('#3b82f6' if is_active else '#1e40af')
-                    box_shadow = '0 0 0 4px rgba(59, 130, 246, 0.4)' if is_current else 'none'
-                    font_weight = '700' if is_current else '600'
-    
-                    stages_html += f"<div style='display: flex; flex-direction: column; align-items: center; z-index: 3; position: relative;'><div style='width: 1.5rem; height: 1.5rem; border-radius: 50%; background: {bg_color}; border: 3px solid {border_color}; box-shadow: {box_shadow}; transition: all 0.3s ease;'></div><div style='margin-top: 0.5rem; font-size: 0.7rem; font-weight: {font_weight}; color: {text_color}; text-transform: uppercase; letter-spacing: 0.5px; white-space: nowrap;'>{stage['name']}</div></div>"
-    
-                progress_html = f"<div style='background: #1e3a8a; padding: 1.25rem; border-radius: 8px; border: 2px solid #10b981;'><div style='display: flex; align-items: center; justify-content: space-between; position: relative;'><div style='position: absolute; top: 0.75rem; left: 2rem; right: 2rem; height: 3px; background: #1e40af; z-index: 1;'></div><div style='position: absolute; top: 0.75rem; left: 2rem; width: calc({progress_width}% - 2rem); height: 3px; background: linear-gradient(90deg, #3b82f6, #10b981); z-index: 2;'></div>{stages_html}</div></div>"
-    
+            # Progress bar HTML is pre-rendered per status at import
+            progress_html = _CARD_PROGRESS_HTML.get(
+                current_status, _CARD_PROGRESS_HTML['Inquiry'])
+
             # Hotel requirement badge and dates
-            hotel_required = booking.get('hotel_required', False)
             hotel_badge = ""
             hotel_dates_html = ""
-    
-            if hotel_required:
-                hotel_badge = "<div style='display: inline-block; background: #f59e0b; color: #ffffff; padding: 0.4rem 0.8rem; border-radius: 6px; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-left: 0.5rem;'>Hotel Required</div>"
-    
-                # Format hotel dates if available
-                hotel_checkin = booking.get('hotel_checkin')
-                hotel_checkout = booking.get('hotel_checkout')
-    
-                if hotel_checkin and not pd.isna(hotel_checkin):
-                    checkin_str = hotel_checkin.strftime('%b %d, %Y')
-                else:
-                    checkin_str = "Not Set"
-    
-                if hotel_checkout and not pd.isna(hotel_checkout):
-                    checkout_str = hotel_checkout.strftime('%b %d, %Y')
-                else:
-                    checkout_str = "Not Set"
-    
-                hotel_dates_html = f"<div style='background: #f59e0b; padding: 1rem; border-radius: 8px; margin-top: 1rem;'><div style='color: #ffffff; font-weight: 700; font-size: 0.75rem; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.75rem;'>Hotel Accommodation</div><div style='display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;'><div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Check-In</div><div style='color: #ffffff; font-size: 0.95rem; font-weight: 700;'>{checkin_str}</div></div><div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Check-Out</div><div style='color: #ffffff; font-size: 0.95rem; font-weight: 700;'>{checkout_str}</div></div></div></div>"
-    
+            if booking.hotel_required:
+                hotel_badge = _HOTEL_BADGE_HTML
+                # Hotel dates were pre-formatted with the page
+                hotel_dates_html = _HOTEL_DATES_TMPL.format_map({
+                    'checkin_str': booking.hotel_in_str,
+                    'checkout_str': booking.hotel_out_str,
+                })
+
             # Golf courses and tee times section
-            golf_courses = booking.get('golf_courses', '')
-            selected_tee_times = booking.get('selected_tee_times', '')
             golf_info_html = ""
-    
-            if golf_courses and not pd.isna(golf_courses) and str(golf_courses).strip():
-                courses_list = str(golf_courses).strip()
-                times_list = str(selected_tee_times).strip() if selected_tee_times and not pd.isna(selected_tee_times) else "Times not specified"
-    
-                golf_info_html = f"<div style='background: #10b981; padding: 1rem; border-radius: 8px; margin-top: 1rem;'><div style='color: #ffffff; font-weight: 700; font-size: 0.75rem; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.75rem;'>Golf Courses & Tee Times</div><div style='display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;'><div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Courses</div><div style='color: #ffffff; font-size: 0.875rem; font-weight: 600; line-height: 1.5;'>{html.escape(courses_list)}</div></div><div><div style='color: #ffffff; font-size: 0.7rem; font-weight: 600; text-transform: uppercase; margin-bottom: 0.25rem;'>Tee Times</div><div style='color: #ffffff; font-size: 0.875rem; font-weight: 600; line-height: 1.5;'>{html.escape(times_list)}</div></div></div></div>"
+            if booking.has_golf:
+                golf_info_html = _GOLF_INFO_TMPL.format_map({
+                    'courses_list': booking.courses_h,
+                    'times_list': booking.times_h if booking.has_times else "Times not specified",
+                })
     
             # Build complete card HTML including progress bar and details
-            card_html = f"<div class='booking-card' style='background: linear-gradient(135deg, #1e3a8a 0%, #1e40af 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; margin-bottom: 0.5rem; box-shadow: 0 4px 16px rgba(59, 130, 246, 0.3); transition: all 0.3s ease;'><div style='display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1.25rem;'><div style='flex: 1;'><div style='display: flex; align-items: center;'><div class='booking-id' style='margin-bottom: 0.5rem;'>{html.escape(str(booking['booking_id']))}</div>{hotel_badge}</div><div class='booking-email'>{html.escape(str(booking['guest_email']))}</div></div><div style='text-align: right;'><div class='timestamp'>REQUESTED</div><div class='timestamp-value'>{requested_time}</div></div></div><div style='margin-bottom: 1.5rem;'>{progress_html}</div><div style='height: 1px; background: linear-gradient(90deg, transparent, #3b82f6, transparent); margin: 1.5rem 0;'></div><div style='display: grid; grid-template-columns: repeat(4, 1fr); gap: 1.5rem; margin-bottom: 1rem;'><div><div class='data-label' style='margin-bottom: 0.5rem;'>TEE DATE</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{tee_date_display}</div></div><div><div class='data-label' style='margin-bottom: 0.5rem;'>TEE TIME</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{tee_time_display}</div></div><div><div class='data-label' style='margin-bottom: 0.5rem;'>PLAYERS</div><div style='font-size: 1rem; font-weight: 600; color: #f9fafb;'>{booking['players']}</div></div><div><div class='data-label' style='margin-bottom: 0.5rem;'>TOTAL</div><div style='font-size: 1.5rem; font-weight: 700; color: #10b981;'>€{booking['total']:,.2f}</div></div></div>{golf_info_html}{hotel_dates_html}</div>"
+            card_html = _CARD_TEMPLATE.format_map({
+                'booking_id': booking.booking_id_h,
+                'hotel_badge': hotel_badge,
+                'guest_email': booking.guest_email_h,
+                'requested_time': requested_time,
+                'progress_html': progress_html,
+                'tee_date_display': tee_date_display,
+                'tee_time_display': tee_time_display,
+                'players': booking.players,
+                'total': booking.total,
+                'golf_info_html': golf_info_html,
+                'hotel_dates_html': hotel_dates_html,
+            })
     
             # Render the complete card
             st.markdown(card_html, unsafe_allow_html=True)
     
-            # Quick status change buttons (above the expander)
-            if not is_rejected and not is_cancelled:
-                st.markdown("<div style='margin: -0.5rem 0 1rem 0;'>", unsafe_allow_html=True)
-                status_col1, status_col2, status_col3, status_col4, status_col5 = st.columns([1, 1, 1, 1, 2])
-    
-                with status_col1:
-                    if booking['status'] in ['Inquiry', 'Pending']:
-                        if st.button("→ Requested", key=f"quick_req_{booking['booking_id']}", use_container_width=True, help="Move to Requested"):
-                            if update_booking_status(booking['booking_id'], 'Requested', st.session_state.username):
-                                st.cache_data.clear()
-                                st.rerun()
-    
-                with status_col2:
-                    if booking['status'] == 'Requested':
-                        if st.button("→ Confirmed", key=f"quick_conf_{booking['booking_id']}", use_container_width=True, help="Move to Confirmed"):
-                            if update_booking_status(booking['booking_id'], 'Confirmed', st.session_state.username):
-                                st.cache_data.clear()
-                                st.rerun()
-    
-                with status_col3:
-                    if booking['status'] == 'Confirmed':
-                        if st.button("→ Booked", key=f"quick_book_{booking['booking_id']}", use_container_width=True, help="Move to Booked"):
-                            if update_booking_status(booking['booking_id'], 'Booked', st.session_state.username):
-                                st.cache_data.clear()
-                                st.rerun()
-    
-                with status_col4:
-                    if booking['status'] not in ['Rejected', 'Cancelled', 'Booked']:
-                        if st.button("Reject", key=f"quick_rej_{booking['booking_id']}", use_container_width=True, help="Reject this booking"):
-                            if update_booking_status(booking['booking_id'], 'Rejected', st.session_state.username):
-                                st.cache_data.clear()
+            # Quick status change buttons (above the expander), grouped in
+            # one form per card so only a click triggers a rerun. Booked
+            # and terminal statuses render no actions, hence no form.
+            if booking.status in ('Inquiry', 'Pending', 'Requested', 'Confirmed'):
+                with st.form(f"actions_{booking.booking_id}", border=False):
+                    status_col1, status_col2, status_col3, status_col4, status_col5 = st.columns([1, 1, 1, 1, 2])
+
+                    with status_col1:
+                        if booking.status in ['Inquiry', 'Pending']:
+                            if st.form_submit_button("→ Requested", use_container_width=True, help="Move to Requested"):
+                                if update_booking_status(booking.booking_id, 'Requested', st.session_state.username):
+                                    load_bookings_from_db.clear()
+                                    st.rerun()
+
+                    with status_col2:
+                        if booking.status == 'Requested':
+                            if st.form_submit_button("→ Confirmed", use_container_width=True, help="Move to Confirmed"):
+                                if update_booking_status(booking.booking_id, 'Confirmed', st.session_state.username):
+                                    load_bookings_from_db.clear()
+                                    st.rerun()
+
+                    with status_col3:
+                        if booking.status == 'Confirmed':
+                            if st.form_submit_button("→ Booked", use_container_width=True, help="Move to Booked"):
+                                if update_booking_status(booking.booking_id, 'Booked', st.session_state.username):
+                                    load_bookings_from_db.clear()
+                                    st.rerun()
+
+                    with status_col4:
+                        if st.form_submit_button("Reject", use_container_width=True, help="Reject this booking"):
+                            if update_booking_status(booking.booking_id, 'Rejected', st.session_state.username):
+                                load_bookings_from_db.clear()
                                 st.rerun()
-    
-                st.markdown("</div>", unsafe_allow_html=True)
-    
+
             with st.expander("View Full Details", expanded=False):
                 detail_col1, detail_col2 = st.columns([2, 1])
     
@@ -2696,22 +3200,22 @@ if page == "Bookings":
                         height=200,
                         disabled=False,
                         label_visibility="collapsed",
-                        key=f"note_{booking['booking_id']}"
+                        key=f"note_{booking.booking_id}"
                     )
     
                     # Save notes button
                     if updated_note != note_content:
-                        if st.button("Save Notes", key=f"save_note_{booking['booking_id']}", use_container_width=True):
-                            if update_booking_note(booking['booking_id'], updated_note):
+                        if st.button("Save Notes", key=f"save_note_{booking.booking_id}", use_container_width=True):
+                            if update_booking_note(booking.booking_id, updated_note):
                                 st.success("Notes saved successfully!")
-                                st.cache_data.clear()
+                                load_bookings_from_db.clear()
                                 st.rerun()
                     
-                    if booking.get('updated_by') and not pd.isna(booking.get('updated_by')):
+                    if booking.updated_by and not pd.isna(booking.updated_by):
                         st.markdown(f"""
                             <div style='margin-top: 1rem; padding: 0.75rem; background: #3d5266; border-radius: 8px; border: 2px solid #6b7c3f;'>
                                 <div style='color: #d4b896; font-size: 0.7rem; font-weight: 600; text-transform: uppercase;'>Last Updated</div>
-                                <div style='color: #f7f5f2; font-size: 0.875rem; margin-top: 0.25rem;'>{booking['updated_at'].strftime('%b %d, %Y • %I:%M %p')} by {booking['updated_by']}</div>
+                                <div style='color: #f7f5f2; font-size: 0.875rem; margin-top: 0.25rem;'>{booking.updated_str} by {booking.updated_by}</div>
                             </div>
                         """, unsafe_allow_html=True)
 
@@ -2722,203 +3226,141 @@ if page == "Bookings":
                         </div>
                     """, unsafe_allow_html=True)
 
-                    emails = load_emails_by_booking_id(booking['booking_id'], booking.get('guest_email'))
+                    show_emails = st.checkbox(
+                        "Load emails",
+                        key=f"show_emails_{booking.booking_id}",
+                        help="Fetch inbound emails for this booking"
+                    )
+                    emails = emails_map.get(booking.booking_id, []) if show_emails else None
 
-                    if not emails:
+                    if emails is None:
+                        pass
+                    elif not emails:
                         st.markdown("""
                             <div style='background: #3d5266; padding: 1rem; border: 2px solid #6b7c3f; border-top: none; border-radius: 0 0 8px 8px;'>
                                 <div style='color: #94a3b8; font-size: 0.875rem; text-align: center;'>No emails found for this booking</div>
                             </div>
                         """, unsafe_allow_html=True)
                     else:
-                        st.markdown(f"""
-                            <div style='background: #3d5266; padding: 1rem; border: 2px solid #6b7c3f; border-top: none; border-radius: 0 0 8px 8px;'>
-                                <div style='color: #10b981; font-size: 0.875rem; font-weight: 600; margin-bottom: 0.75rem;'>{len(emails)} email(s) found</div>
-                        """, unsafe_allow_html=True)
-
-                        for email_idx, email in enumerate(emails):
-                            # Determine status color and text
+                        # Whole email list as one markdown blob; native
+                        # <details> collapses bodies without widget state
+                        email_cards = []
+                        for email in emails:
                             if email.get('processed'):
-                                status_color = '#10b981'
-                                status_text = 'Processed'
+                                status_color, status_text = '#10b981', 'Processed'
                             elif email.get('error_message'):
-                                status_color = '#ef4444'
-                                status_text = 'Error'
+                                status_color, status_text = '#ef4444', 'Error'
                             else:
-                                status_color = '#fbbf24'
-                                status_text = 'Unprocessed'
+                                status_color, status_text = '#fbbf24', 'Unprocessed'
 
-                            # Email type color
                             email_type = email.get('email_type', 'unknown')
-                            email_type_color = {
-                                'inquiry': '#3b82f6',
-                                'booking_request': '#8b5cf6',
-                                'staff_confirmation': '#10b981',
-                                'waitlist_optin': '#f59e0b',
-                                'customer_reply': '#6366f1'
-                            }.get(email_type, '#64748b')
-
-                            subject = html.escape(str(email.get('subject', 'No Subject')))
-                            from_email = html.escape(str(email.get('from_email', 'N/A')))
-                            received_at = email.get('received_at_formatted', 'N/A')
-
-                            st.markdown(f"""
-                                <div style='background: #2d3e50; padding: 0.75rem; border-radius: 6px; margin-bottom: 0.5rem; border-left: 3px solid {status_color};'>
-                                    <div style='display: flex; justify-content: space-between; align-items: start; margin-bottom: 0.5rem;'>
-                                        <div style='flex: 1;'>
-                                            <div style='color: #f9fafb; font-weight: 600; font-size: 0.875rem;'>{subject}</div>
-                                            <div style='color: #3b82f6; font-size: 0.75rem; margin-top: 0.25rem;'>From: {from_email}</div>
-                                        </div>
-                                    </div>
-                                    <div style='display: flex; gap: 0.5rem; align-items: center; flex-wrap: wrap;'>
-                                        <div style='background: {email_type_color}20; border: 1px solid {email_type_color}; color: {email_type_color}; padding: 0.25rem 0.5rem; border-radius: 4px; font-weight: 600; font-size: 0.65rem; text-transform: uppercase;'>
-                                            {email_type}
-                                        </div>
-                                        <div style='background: {status_color}20; border: 1px solid {status_color}; color: {status_color}; padding: 0.25rem 0.5rem; border-radius: 4px; font-weight: 600; font-size: 0.65rem; text-transform: uppercase;'>
-                                            {status_text}
-                                        </div>
-                                        <div style='color: #64748b; font-size: 0.7rem; margin-left: auto;'>{received_at}</div>
-                                    </div>
-                                </div>
-                            """, unsafe_allow_html=True)
-
-                            # Show email body details (no expander since we're already inside one)
-                            body_text = email.get('body_text') or 'No body text available'
-
-                            # Show metadata
-                            col_email1, col_email2 = st.columns(2)
-                            with col_email1:
-                                message_id = email.get('message_id') or 'N/A'
-                                display_id = message_id[:30] if len(message_id) > 30 else message_id
-                                st.caption(f"📧 Message ID: {display_id}...")
-                            with col_email2:
-                                processing_status = email.get('processing_status')
-                                if processing_status:
-                                    st.caption(f"📊 Status: {processing_status}")
-
-                            # Show email body in collapsed text area
-                            st.text_area(
-                                "Email Body",
-                                value=body_text,
-                                height=100,
-                                disabled=True,
-                                key=f"email_body_{booking['booking_id']}_{email_idx}",
-                                label_visibility="collapsed"
-                            )
-
-                            if email.get('error_message'):
-                                st.error(f"⚠️ Error: {email.get('error_message')}")
-
-                            # Add spacing between emails
-                            st.markdown("<div style='height: 0.5rem;'></div>", unsafe_allow_html=True)
-
-                        st.markdown("</div>", unsafe_allow_html=True)
+                            message_id = email.get('message_id') or 'N/A'
+                            processing_status = email.get('processing_status')
+                            error_message = email.get('error_message')
+
+                            email_cards.append(_EMAIL_CARD_TMPL.format_map({
+                                'status_color': status_color,
+                                'status_text': status_text,
+                                'email_type': email_type,
+                                'email_type_color': _EMAIL_TYPE_COLORS.get(email_type, '#64748b'),
+                                'subject': html.escape(str(email.get('subject', 'No Subject'))),
+                                'from_email': html.escape(str(email.get('from_email', 'N/A'))),
+                                'received_at': email.get('received_at_formatted', 'N/A'),
+                                'body': html.escape(str(email.get('body_text') or 'No body text available')),
+                                'message_id': html.escape(message_id[:30]),
+                                'processing_html': (f" • 📊 Status: {html.escape(str(processing_status))}"
+                                                    if processing_status else ''),
+                                'error_html': (f"<div style='color: #ef4444; font-size: 0.75rem; margin-top: 0.25rem;'>⚠️ Error: {html.escape(str(error_message))}</div>"
+                                               if error_message else ''),
+                            }))
+
+                        st.markdown(
+                            "<div style='background: #3d5266; padding: 1rem; border: 2px solid #6b7c3f; border-top: none; border-radius: 0 0 8px 8px;'>"
+                            f"<div style='color: #10b981; font-size: 0.875rem; font-weight: 600; margin-bottom: 0.75rem;'>{len(emails)} email(s) found</div>"
+                            + "".join(email_cards) + "</div>",
+                            unsafe_allow_html=True
+                        )
 
                 with detail_col2:
                     st.markdown("### Quick Actions")
 
                     # Tour Operator Toggle
-                    is_tour_operator = booking.get('is_tour_operator', False)
-                    deposit_percentage = booking.get('deposit_percentage', DEFAULT_DEPOSIT_PERCENTAGE)
+                    is_tour_operator = booking.is_tour_operator
+                    deposit_percentage = booking.deposit_percentage
 
-                    st.markdown("""
-                        <div style='background: #1e3a8a; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem; border: 2px solid #fbbf24;'>
-                            <div style='color: #fbbf24; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>Customer Type</div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(_CUSTOMER_TYPE_HEADER_HTML, unsafe_allow_html=True)
 
                     tour_operator_toggle = st.checkbox(
                         f"Tour Operator (50% deposit)",
                         value=is_tour_operator,
-                        key=f"tour_op_{booking['booking_id']}",
+                        key=f"tour_op_{booking.booking_id}",
                         help="Tour Operators require 50% deposit instead of standard 20%"
                     )
 
                     if tour_operator_toggle != is_tour_operator:
-                        if update_tour_operator_status(booking['booking_id'], tour_operator_toggle):
+                        if update_tour_operator_status(booking.booking_id, tour_operator_toggle):
                             st.success(f"Updated to {'Tour Operator' if tour_operator_toggle else 'Regular Customer'}")
-                            st.cache_data.clear()
+                            load_bookings_from_db.clear()
                             st.rerun()
 
                     # Payment Status Display
-                    payment_status = booking.get('payment_status', 'not_requested')
-                    total_paid = booking.get('total_paid', 0.0)
-
-                    payment_status_colors = {
-                        'not_requested': '#64748b',
-                        'pending': '#fbbf24',
-                        'deposit_paid': '#3b82f6',
-                        'fully_paid': '#10b981',
-                        'failed': '#ef4444'
-                    }
-
-                    payment_status_text = {
-                        'not_requested': 'Not Requested',
-                        'pending': 'Payment Pending',
-                        'deposit_paid': 'Deposit Paid',
-                        'fully_paid': 'Fully Paid',
-                        'failed': 'Payment Failed'
-                    }
-
-                    status_color = payment_status_colors.get(payment_status, '#64748b')
-                    status_text = payment_status_text.get(payment_status, 'Unknown')
+                    total_paid = booking.total_paid
 
-                    st.markdown(f"""
-                        <div style='background: #1e3a8a; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem; border: 2px solid {status_color};'>
-                            <div style='color: #f9fafb; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>Payment Status</div>
-                            <div style='color: {status_color}; font-size: 1rem; font-weight: 700; margin-top: 0.5rem;'>{status_text}</div>
-                            <div style='color: #ffffff; font-size: 0.875rem; margin-top: 0.5rem;'>Paid: €{total_paid:.2f} / €{booking['total']:.2f}</div>
-                            <div style='color: #94a3b8; font-size: 0.75rem; margin-top: 0.25rem;'>Deposit: {deposit_percentage}%</div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                    status_color = booking.pay_color
+                    status_text = booking.pay_text
+
+                    st.markdown(_PAY_STATUS_TMPL.format_map({
+                        'status_color': status_color,
+                        'status_text': status_text,
+                        'total_paid': total_paid,
+                        'total': booking.total,
+                        'deposit_percentage': deposit_percentage,
+                    }), unsafe_allow_html=True)
 
                     # Request Payment Section
-                    if STRIPE_SECRET_KEY:
-                        st.markdown("""
-                            <div style='background: #10b981; padding: 0.75rem; border-radius: 8px; margin-bottom: 1rem;'>
-                                <div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px;'>💳 Payment Request</div>
-                            </div>
-                        """, unsafe_allow_html=True)
+                    if stripe_enabled:
+                        st.markdown(_PAYMENT_REQUEST_HEADER_HTML, unsafe_allow_html=True)
 
                         # Payment type selection
                         payment_type = st.radio(
                             "Payment Type",
                             ["deposit", "full"],
                             format_func=lambda x: f"Deposit ({deposit_percentage}%)" if x == "deposit" else "Full Payment",
-                            key=f"payment_type_{booking['booking_id']}",
+                            key=f"payment_type_{booking.booking_id}",
                             horizontal=True
                         )
 
-                        # Calculate amount
+                        # Amounts were pre-computed vectorized over the page
                         if payment_type == "deposit":
-                            payment_amount = float(booking['total']) * (deposit_percentage / 100.0)
+                            payment_amount = booking.deposit_amount
                         else:
-                            payment_amount = float(booking['total'])
+                            payment_amount = float(booking.total)
 
-                        st.markdown(f"""
-                            <div style='text-align: center; padding: 0.5rem; background: #1e3a8a; border-radius: 6px; margin-bottom: 0.75rem;'>
-                                <div style='color: #94a3b8; font-size: 0.75rem;'>Amount to Request</div>
-                                <div style='color: #10b981; font-size: 1.5rem; font-weight: 700;'>€{payment_amount:.2f}</div>
-                            </div>
-                        """, unsafe_allow_html=True)
+                        st.markdown(_PAY_AMOUNT_TMPL.format_map({'payment_amount': payment_amount}),
+                                    unsafe_allow_html=True)
 
-                        if st.button("📧 Send Payment Request", key=f"send_payment_{booking['booking_id']}", use_container_width=True, type="primary"):
+                        if st.button("📧 Send Payment Request", key=f"send_payment_{booking.booking_id}", use_container_width=True, type="primary"):
                             try:
                                 # Create Stripe payment link
                                 with st.spinner("Creating payment link..."):
                                     payment_data = create_stripe_payment_link(
-                                        booking_id=booking['booking_id'],
+                                        booking_id=booking.booking_id,
                                         amount=payment_amount,
                                         payment_type=payment_type,
                                         deposit_percentage=deposit_percentage,
-                                        guest_email=booking['guest_email'],
-                                        guest_name=booking.get('guest_name')
+                                        guest_email=booking.guest_email,
+                                        guest_name=booking.guest_name
                                     )
 
+                                # Unique id minted per send attempt, outside the
+                                # memoized link helper, so retries never replay
+                                # one into the payments UNIQUE column
+                                payment_id = f"PAY-{datetime.now().strftime('%Y%m%d%H%M%S')}-{booking.booking_id}"
+
                                 # Save payment record
                                 if save_payment_record(
-                                    booking_id=booking['booking_id'],
-                                    payment_id=payment_data['payment_id'],
+                                    booking_id=booking.booking_id,
+                                    payment_id=payment_id,
                                     amount=payment_amount,
                                     payment_type=payment_type,
                                     deposit_percentage=deposit_percentage,
@@ -2926,9 +3368,11 @@ if page == "Bookings":
                                     stripe_payment_link_id=payment_data['stripe_payment_link_id'],
                                     created_by=st.session_state.username
                                 ):
+                                    # Record saved; drop the cached history either way
+                                    get_payments_by_booking_ids.clear()
                                     # Send email
                                     success, message = send_payment_request_email(
-                                        booking=booking,
+                                        booking=booking._asdict(),
                                         payment_link_url=payment_data['payment_link_url'],
                                         amount=payment_amount,
                                         payment_type=payment_type
@@ -2937,7 +3381,7 @@ if page == "Bookings":
                                     if success:
                                         st.success(f"✅ Payment request sent! {message}")
                                         st.info(f"Payment link: {payment_data['payment_link_url']}")
-                                        st.cache_data.clear()
+                                        load_bookings_from_db.clear()
                                         st.rerun()
                                     else:
                                         st.warning(f"Payment link created but email failed: {message}")
@@ -2947,131 +3391,100 @@ if page == "Bookings":
                             except Exception as e:
                                 st.error(f"Error: {str(e)}")
 
-                        # Display payment history
-                        payments = get_booking_payments(booking['booking_id'])
-                        if payments:
-                            st.markdown("""
-                                <div style='margin-top: 1rem; padding: 0.75rem; background: #1e3a8a; border-radius: 8px; border: 2px solid #3b82f6;'>
-                                    <div style='color: #3b82f6; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Payment History</div>
-                            """, unsafe_allow_html=True)
-
-                            for payment in payments[:3]:  # Show last 3 payments
-                                payment_date = payment.get('created_at')
-                                if payment_date and not pd.isna(payment_date):
-                                    payment_date_str = payment_date.strftime('%b %d, %Y')
-                                else:
-                                    payment_date_str = 'N/A'
-
-                                st.markdown(f"""
-                                    <div style='background: #2d3e50; padding: 0.5rem; border-radius: 4px; margin-bottom: 0.5rem;'>
-                                        <div style='color: #ffffff; font-size: 0.75rem;'>{payment['payment_type'].capitalize()}: €{payment['amount']:.2f}</div>
-                                        <div style='color: #94a3b8; font-size: 0.65rem;'>{payment_date_str} • {payment['payment_status']}</div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-
-                            st.markdown("</div>", unsafe_allow_html=True)
-                    else:
-                        st.warning("Stripe not configured. Set STRIPE_SECRET_KEY to enable payments.")
+                        # Payment history renders (and is fetched) only on demand
+                        if st.checkbox("Payment history", key=f"show_payments_{booking.booking_id}"):
+                            payments = payments_map.get(booking.booking_id, [])
+                            if payments:
+                                st.markdown(build_payment_history_html(payments), unsafe_allow_html=True)
+                            else:
+                                st.caption("No payments recorded yet.")
 
-                    st.markdown("<div style='margin-top: 1.5rem; border-top: 2px solid #3b82f6; padding-top: 1rem;'></div>", unsafe_allow_html=True)
+                    st.markdown(_SECTION_DIVIDER_HTML, unsafe_allow_html=True)
 
-                    current_status = booking['status']
+                    current_status = booking.status
 
                     # Status change dropdown - allows navigation to any status
-                    st.markdown("<div style='margin-bottom: 1rem;'>", unsafe_allow_html=True)
-                    all_statuses = ['Inquiry', 'Requested', 'Confirmed', 'Booked', 'Rejected', 'Cancelled']
-                    # Set default to current status
-                    current_index = all_statuses.index(current_status) if current_status in all_statuses else 0
-    
+                    current_index = _STATUS_INDEX.get(current_status, 0)
+
                     new_status = st.selectbox(
                         "Change Status To:",
                         all_statuses,
                         index=current_index,
-                        key=f"status_select_{booking['booking_id']}"
+                        key=f"status_select_{booking.booking_id}"
                     )
     
                     if new_status != current_status:
-                        if st.button("Update Status", key=f"update_status_{booking['booking_id']}", use_container_width=True):
-                            if update_booking_status(booking['booking_id'], new_status, st.session_state.username):
+                        if st.button("Update Status", key=f"update_status_{booking.booking_id}", use_container_width=True):
+                            if update_booking_status(booking.booking_id, new_status, st.session_state.username):
                                 st.success(f"Status updated to {new_status}")
-                                st.cache_data.clear()
+                                load_bookings_from_db.clear()
                                 st.rerun()
-    
-                    st.markdown("</div>", unsafe_allow_html=True)
-    
+
                     # Delete booking button (with confirmation)
-                    st.markdown("<div style='margin-top: 1.5rem; border-top: 2px solid #6b7c3f; padding-top: 1rem;'></div>", unsafe_allow_html=True)
-                    st.markdown("<div style='color: #cc8855; font-weight: 600; font-size: 0.875rem; margin-bottom: 0.5rem;'>Danger Zone</div>", unsafe_allow_html=True)
-    
-                    # Initialize session state for delete confirmation
-                    if f"confirm_delete_{booking['booking_id']}" not in st.session_state:
-                        st.session_state[f"confirm_delete_{booking['booking_id']}"] = False
+                    st.markdown(_DANGER_ZONE_HTML, unsafe_allow_html=True)
     
-                    if not st.session_state[f"confirm_delete_{booking['booking_id']}"]:
-                        if st.button("Delete Booking", key=f"del_{booking['booking_id']}", use_container_width=True, type="secondary"):
-                            st.session_state[f"confirm_delete_{booking['booking_id']}"] = True
+                    if booking.booking_id not in confirm_delete_ids:
+                        if st.button("Delete Booking", key=f"del_{booking.booking_id}", use_container_width=True, type="secondary"):
+                            confirm_delete_ids.add(booking.booking_id)
                             st.rerun()
                     else:
                         st.warning("Are you sure? This action cannot be undone.")
                         col_confirm1, col_confirm2 = st.columns(2)
                         with col_confirm1:
-                            if st.button("Yes, Delete", key=f"confirm_del_{booking['booking_id']}", use_container_width=True):
-                                if delete_booking(booking['booking_id']):
+                            if st.button("Yes, Delete", key=f"confirm_del_{booking.booking_id}", use_container_width=True):
+                                if delete_booking(booking.booking_id):
                                     st.success("Booking deleted successfully!")
-                                    st.cache_data.clear()
-                                    st.session_state[f"confirm_delete_{booking['booking_id']}"] = False
+                                    load_bookings_from_db.clear()
+                                    confirm_delete_ids.discard(booking.booking_id)
                                     st.rerun()
                         with col_confirm2:
-                            if st.button("Cancel", key=f"cancel_del_{booking['booking_id']}", use_container_width=True):
-                                st.session_state[f"confirm_delete_{booking['booking_id']}"] = False
+                            if st.button("Cancel", key=f"cancel_del_{booking.booking_id}", use_container_width=True):
+                                confirm_delete_ids.discard(booking.booking_id)
                                 st.rerun()
     
-    st.markdown("<div style='height: 2px; background: #6b7c3f; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_EXPORT_DIVIDER_HTML, unsafe_allow_html=True)
     st.markdown("#### Export Options")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        if st.button("Export to Excel", use_container_width=True):
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                filtered_df.to_excel(writer, index=False, sheet_name='Bookings')
-    
-            st.download_button(
-                label="Download Excel",
-                data=output.getvalue(),
-                file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
-            )
-    
+        st.download_button(
+            label="Export to Excel",
+            data=_excel_bytes(filtered_df),
+            file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True
+        )
+
     with col2:
-        if st.button("Export to CSV", use_container_width=True):
-            csv = filtered_df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+        st.download_button(
+            label="Export to CSV",
+            data=_csv_bytes(filtered_df),
+            file_name=f"bookings_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
     
     with col3:
         if st.button("Refresh Data", use_container_width=True):
-            st.cache_data.clear()
+            load_bookings_from_db.clear()
             st.rerun()
     
     with col4:
         if st.button("Fix Tee Times", use_container_width=True):
-            with st.spinner("Extracting tee times from email content..."):
-                updated, not_found = fix_all_tee_times(st.session_state.customer_id)
-                if updated > 0:
-                    st.success(f"Updated {updated} booking(s) with extracted tee times!")
-                    st.cache_data.clear()
-                    st.rerun()
-                elif not_found > 0:
-                    st.warning(f"Could not extract tee times from {not_found} booking(s)")
-                else:
-                    st.info("All bookings already have tee times set")
+            with st.status("Extracting tee times from email content...") as fix_status:
+                updated = not_found = 0
+                for processed, total, updated, not_found in fix_all_tee_times(st.session_state.customer_id):
+                    if total:
+                        fix_status.update(label=f"Scanning bookings... {processed}/{total}")
+                fix_status.update(label="Tee time extraction finished", state="complete")
+            if updated > 0:
+                st.success(f"Updated {updated} booking(s) with extracted tee times!")
+                load_bookings_from_db.clear()
+                st.rerun()
+            elif not_found > 0:
+                st.warning(f"Could not extract tee times from {not_found} booking(s)")
+            else:
+                st.info("All bookings already have tee times set")
 
 # ========================================
 # REPORTS & ANALYTICS VIEW
@@ -3101,41 +3514,43 @@ elif page == "Reports & Analytics":
         )
 
     with col_range2:
+        # Floored to the minute so the period bounds - and with them the
+        # _analysis_slice cache key - are stable across reruns
+        now_ts = pd.Timestamp.now().floor('min')
         if analysis_period == "Last 7 Days":
-            analysis_start = datetime.now() - timedelta(days=7)
-            analysis_end = datetime.now()
+            analysis_start = now_ts - timedelta(days=7)
+            analysis_end = now_ts
         elif analysis_period == "Last 30 Days":
-            analysis_start = datetime.now() - timedelta(days=30)
-            analysis_end = datetime.now()
+            analysis_start = now_ts - timedelta(days=30)
+            analysis_end = now_ts
         elif analysis_period == "Last 90 Days":
-            analysis_start = datetime.now() - timedelta(days=90)
-            analysis_end = datetime.now()
+            analysis_start = now_ts - timedelta(days=90)
+            analysis_end = now_ts
         elif analysis_period == "Last 6 Months":
-            analysis_start = datetime.now() - timedelta(days=180)
-            analysis_end = datetime.now()
+            analysis_start = now_ts - timedelta(days=180)
+            analysis_end = now_ts
         elif analysis_period == "Last Year":
-            analysis_start = datetime.now() - timedelta(days=365)
-            analysis_end = datetime.now()
+            analysis_start = now_ts - timedelta(days=365)
+            analysis_end = now_ts
         elif analysis_period == "All Time":
             analysis_start = df['timestamp'].min()
-            analysis_end = datetime.now()
+            analysis_end = now_ts
         else:  # Custom
             custom_range = st.date_input(
                 "Custom Range",
-                value=(datetime.now().date() - timedelta(days=30), datetime.now().date())
+                value=(now_ts.date() - timedelta(days=30), now_ts.date())
             )
             if isinstance(custom_range, tuple) and len(custom_range) == 2:
                 analysis_start = pd.to_datetime(custom_range[0])
                 analysis_end = pd.to_datetime(custom_range[1])
             else:
-                analysis_start = datetime.now() - timedelta(days=30)
-                analysis_end = datetime.now()
+                analysis_start = now_ts - timedelta(days=30)
+                analysis_end = now_ts
 
-    # Filter data by analysis period
-    analysis_df = df[
-        (df['timestamp'] >= pd.to_datetime(analysis_start)) &
-        (df['timestamp'] <= pd.to_datetime(analysis_end))
-    ].copy()
+    # Period filter and headline metrics come from one cached pass
+    analysis_df, (total_bookings, total_revenue,
+                  avg_booking_value, total_players) = _analysis_slice(
+        df, pd.to_datetime(analysis_start), pd.to_datetime(analysis_end))
 
     st.markdown("<div style='height: 2px; background: #3b82f6; margin: 1.5rem 0;'></div>", unsafe_allow_html=True)
 
@@ -3147,7 +3562,6 @@ elif page == "Reports & Analytics":
     metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
 
     with metric_col1:
-        total_bookings = len(analysis_df)
         st.markdown(f"""
             <div style='background: linear-gradient(135deg, #059669 0%, #10b981 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; text-align: center;'>
                 <div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Total Bookings</div>
@@ -3156,7 +3570,6 @@ elif page == "Reports & Analytics":
         """, unsafe_allow_html=True)
 
     with metric_col2:
-        total_revenue = analysis_df['total'].sum()
         st.markdown(f"""
             <div style='background: linear-gradient(135deg, #059669 0%, #10b981 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; text-align: center;'>
                 <div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Total Revenue</div>
@@ -3165,7 +3578,6 @@ elif page == "Reports & Analytics":
         """, unsafe_allow_html=True)
 
     with metric_col3:
-        avg_booking_value = analysis_df['total'].mean() if len(analysis_df) > 0 else 0
         st.markdown(f"""
             <div style='background: linear-gradient(135deg, #059669 0%, #10b981 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; text-align: center;'>
                 <div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Avg Booking Value</div>
@@ -3174,7 +3586,6 @@ elif page == "Reports & Analytics":
         """, unsafe_allow_html=True)
 
     with metric_col4:
-        total_players = analysis_df['players'].sum()
         st.markdown(f"""
             <div style='background: linear-gradient(135deg, #059669 0%, #10b981 100%); border: 2px solid #10b981; border-radius: 12px; padding: 1.5rem; text-align: center;'>
                 <div style='color: #ffffff; font-size: 0.75rem; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 0.5rem;'>Total Players</div>
@@ -3182,17 +3593,18 @@ elif page == "Reports & Analytics":
             </div>
         """, unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # BOOKING STATUS DISTRIBUTION
     # ========================================
+    # Shared by the distribution table and the conversion funnel below
+    status_counts, revenue_by_status = _status_summary(analysis_df)
+
     col_charts1, col_charts2 = st.columns(2)
 
     with col_charts1:
         st.markdown("### Booking Status Distribution")
-        status_counts = analysis_df['status'].value_counts()
-
         status_data = []
         for status, count in status_counts.items():
             percentage = (count / len(analysis_df)) * 100
@@ -3222,8 +3634,6 @@ elif page == "Reports & Analytics":
 
     with col_charts2:
         st.markdown("### Revenue by Status")
-        revenue_by_status = analysis_df.groupby('status')['total'].sum().sort_values(ascending=False)
-
         total_rev = revenue_by_status.sum()
 
         for status, revenue in revenue_by_status.items():
@@ -3243,21 +3653,15 @@ elif page == "Reports & Analytics":
                 </div>
             """, unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # BOOKING TRENDS OVER TIME
     # ========================================
     st.markdown("### Booking Trends Over Time")
 
-    # Group by date
-    analysis_df['booking_date'] = analysis_df['timestamp'].dt.date
-    daily_bookings = analysis_df.groupby('booking_date').agg({
-        'booking_id': 'count',
-        'total': 'sum',
-        'players': 'sum'
-    }).reset_index()
-    daily_bookings.columns = ['Date', 'Bookings', 'Revenue', 'Players']
+    # Group by date (cached on the frame fingerprint)
+    daily_bookings = _daily_bookings(analysis_df)
 
     # Create simple line chart display
     st.markdown("#### Daily Booking Volume")
@@ -3283,18 +3687,20 @@ elif page == "Reports & Analytics":
     else:
         st.info("No booking trend data available")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # CONVERSION FUNNEL
     # ========================================
     st.markdown("### Booking Conversion Funnel")
 
+    # Stage counts read from the cached status summary instead of four
+    # boolean-mask scans over the status column
     funnel_stages = [
-        ('Inquiry', len(analysis_df[analysis_df['status'].isin(['Inquiry', 'Pending'])])),
-        ('Requested', len(analysis_df[analysis_df['status'] == 'Requested'])),
-        ('Confirmed', len(analysis_df[analysis_df['status'] == 'Confirmed'])),
-        ('Booked', len(analysis_df[analysis_df['status'] == 'Booked']))
+        ('Inquiry', int(status_counts.get('Inquiry', 0)) + int(status_counts.get('Pending', 0))),
+        ('Requested', int(status_counts.get('Requested', 0))),
+        ('Confirmed', int(status_counts.get('Confirmed', 0))),
+        ('Booked', int(status_counts.get('Booked', 0)))
     ]
 
     total_funnel = sum([count for _, count in funnel_stages])
@@ -3342,7 +3748,7 @@ elif page == "Reports & Analytics":
     else:
         st.info("No funnel data available for this period")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # PEAK BOOKING TIMES
@@ -3353,7 +3759,7 @@ elif page == "Reports & Analytics":
 
     with col_peak1:
         st.markdown("#### Most Popular Tee Times")
-        tee_time_popularity = analysis_df[analysis_df['tee_time'].notna()].groupby('tee_time').size().sort_values(ascending=False).head(10)
+        tee_time_popularity = _tee_time_popularity(analysis_df)
 
         if len(tee_time_popularity) > 0:
             max_pop = tee_time_popularity.max()
@@ -3377,11 +3783,7 @@ elif page == "Reports & Analytics":
 
     with col_peak2:
         st.markdown("#### Busiest Days of Week")
-        analysis_df['day_of_week'] = pd.to_datetime(analysis_df['date']).dt.day_name()
-        day_popularity = analysis_df.groupby('day_of_week').size().reindex(
-            ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
-            fill_value=0
-        )
+        day_popularity = _day_popularity(analysis_df)
 
         if day_popularity.sum() > 0:
             max_day = day_popularity.max()
@@ -3403,7 +3805,7 @@ elif page == "Reports & Analytics":
         else:
             st.info("No day of week data available")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # LEAD TIMES ANALYTICS
@@ -3475,7 +3877,7 @@ elif page == "Reports & Analytics":
     else:
         st.info("No lead time data available for this period")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # CUSTOMER INQUIRY FREQUENCY
@@ -3535,7 +3937,7 @@ elif page == "Reports & Analytics":
     else:
         st.info("No customer data available")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # GOLF COURSE POPULARITY
@@ -3574,7 +3976,7 @@ elif page == "Reports & Analytics":
     else:
         st.info("No golf course data available. Ensure bookings have golf course information.")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # ========================================
     # EXPORT ANALYTICS
@@ -3624,6 +4026,10 @@ elif page == "Reports & Analytics":
 
     with export_col3:
         if st.button("Refresh Analytics", use_container_width=True):
+            # The loader and period slice live in cache_resource, which
+            # st.cache_data.clear() does not touch
+            load_bookings_from_db.clear()
+            _analysis_slice.clear()
             st.cache_data.clear()
             st.rerun()
 
@@ -3678,7 +4084,7 @@ elif page == "Waitlist":
             </div>
         """, unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Add to Waitlist Form
     st.markdown("### Add to Waitlist")
@@ -3718,7 +4124,7 @@ elif page == "Waitlist":
                 else:
                     st.error("Please fill in required fields (Email and Date)")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Waitlist Entries
     st.markdown("### Active Waitlist Entries")
@@ -3799,7 +4205,7 @@ elif page == "Waitlist":
                         success, booking_id = convert_waitlist_to_booking(entry, entry.get('preferred_time', ''))
                         if success:
                             st.success(f"Converted to booking: {booking_id}")
-                            st.cache_data.clear()
+                            load_bookings_from_db.clear()
                             st.rerun()
 
                 with col_action3:
@@ -3813,7 +4219,7 @@ elif page == "Waitlist":
                             st.success("Waitlist entry deleted")
                             st.rerun()
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Check for availability matches
     st.markdown("### Find Available Slots")
@@ -3824,9 +4230,9 @@ elif page == "Waitlist":
     with col_match2:
         if st.button("Find Matching Waitlist Entries", use_container_width=True):
             matches = get_waitlist_matches(st.session_state.customer_id, match_date)
-            if not matches.empty:
+            if matches:
                 st.success(f"Found {len(matches)} matching waitlist entries for {match_date}")
-                for _, match in matches.iterrows():
+                for match in matches:
                     st.markdown(f"""
                         <div style='background: #10b981; border-radius: 8px; padding: 1rem; margin-bottom: 0.5rem;'>
                             <div style='color: #ffffff; font-weight: 600;'>{match['guest_email']}</div>
@@ -3855,8 +4261,8 @@ elif page == "Marketing Segmentation":
         st.info("No booking data available for segmentation analysis")
         st.stop()
 
-    # Calculate segments
-    segments_df = identify_marketing_segments(df)
+    # Calculate segments (aggregation happens in SQL, not pandas)
+    segments_df = identify_marketing_segments('demo')
 
     # Segment overview
     st.markdown("### Segment Overview")
@@ -3886,7 +4292,7 @@ elif page == "Marketing Segmentation":
                 </div>
             """, unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Frequent Non-Bookers Section (High Priority)
     st.markdown("### High Priority: Frequent Non-Bookers")
@@ -3921,7 +4327,7 @@ elif page == "Marketing Segmentation":
     else:
         st.info("No frequent non-bookers identified - great news!")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Repeat Inquirers (Medium Priority)
     st.markdown("### Medium Priority: Repeat Inquirers")
@@ -3956,7 +4362,7 @@ elif page == "Marketing Segmentation":
     else:
         st.info("No repeat inquirers identified")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # High-Value Customers (VIP)
     st.markdown("### VIP: High-Value Customers")
@@ -3991,7 +4397,7 @@ elif page == "Marketing Segmentation":
     else:
         st.info("No high-value customers identified yet")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Export Segments
     st.markdown("### Export Segments")
@@ -4043,6 +4449,18 @@ elif page == "Email Automation":
         <p style='color: #ffffff; margin-bottom: 1.5rem; font-size: 0.9375rem;'>Automated pre-arrival and post-play email campaigns</p>
     """, unsafe_allow_html=True)
 
+    # Outcomes of queued background sends, tallied by the done-callbacks
+    _dispatcher = _email_dispatcher()
+    with _dispatcher['lock']:
+        _sent_total = _dispatcher['stats']['sent']
+        _failed_total = _dispatcher['stats']['failed']
+    if _sent_total or _failed_total:
+        if _failed_total:
+            st.warning(f"Background deliveries this session: {_sent_total} sent, "
+                       f"{_failed_total} failed (details in the server log)")
+        else:
+            st.caption(f"Background deliveries this session: {_sent_total} sent")
+
     # Configuration check
     config_status = []
     if EmailConfig.SENDGRID_API_KEY:
@@ -4059,7 +4477,7 @@ elif page == "Email Automation":
     else:
         st.warning(f"Email configuration incomplete. Set environment variables: SENDGRID_API_KEY, FROM_EMAIL, SENDGRID_TEMPLATE_PRE_ARRIVAL, SENDGRID_TEMPLATE_POST_PLAY")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Campaign overview
     st.markdown("### Campaign Overview")
@@ -4084,7 +4502,7 @@ elif page == "Email Automation":
             </div>
         """, unsafe_allow_html=True)
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Campaign tabs
     tab1, tab2, tab3 = st.tabs(["Pre-Arrival Emails", "Post-Play Emails", "Campaign Settings"])
@@ -4136,13 +4554,13 @@ elif page == "Email Automation":
                 if len(config_status) < 4:
                     st.error("Email configuration incomplete. Please set all required environment variables.")
                 else:
-                    with st.spinner("Sending pre-arrival emails..."):
-                        sent, failed, results = process_pre_arrival_emails(club_filter='demo', dry_run=False)
+                    with st.spinner("Queueing pre-arrival emails..."):
+                        queued, failed, results = process_pre_arrival_emails(club_filter='demo', dry_run=False)
 
-                        if sent > 0:
-                            st.success(f"Successfully sent {sent} pre-arrival emails")
+                        if queued > 0:
+                            st.success(f"Queued {queued} pre-arrival emails for background delivery")
                         if failed > 0:
-                            st.error(f"Failed to send {failed} emails")
+                            st.error(f"Failed to queue {failed} emails")
 
                         if results:
                             results_df = pd.DataFrame(results)
@@ -4195,13 +4613,13 @@ elif page == "Email Automation":
                 if len(config_status) < 4:
                     st.error("Email configuration incomplete. Please set all required environment variables.")
                 else:
-                    with st.spinner("Sending post-play emails..."):
-                        sent, failed, results = process_post_play_emails(club_filter='demo', dry_run=False)
+                    with st.spinner("Queueing post-play emails..."):
+                        queued, failed, results = process_post_play_emails(club_filter='demo', dry_run=False)
 
-                        if sent > 0:
-                            st.success(f"Successfully sent {sent} post-play emails")
+                        if queued > 0:
+                            st.success(f"Queued {queued} post-play emails for background delivery")
                         if failed > 0:
-                            st.error(f"Failed to send {failed} emails")
+                            st.error(f"Failed to queue {failed} emails")
 
                         if results:
                             results_df = pd.DataFrame(results)
@@ -4302,7 +4720,7 @@ elif page == "Notify Integration":
 
     st.markdown(f"**{len(export_df)} bookings selected for export**")
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Export Options
     st.markdown("### Export Options")
@@ -4379,7 +4797,7 @@ elif page == "Notify Integration":
         with st.expander("Preview CSV Data", expanded=False):
             st.dataframe(pd.read_csv(BytesIO(csv_data.encode())))
 
-    st.markdown("<div style='height: 2px; background: #3b82f6; margin: 2rem 0;'></div>", unsafe_allow_html=True)
+    st.markdown(_PAGE_DIVIDER_HTML, unsafe_allow_html=True)
 
     # Export History (Mock)
     st.markdown("### Export Formats Reference")